@@ -1,21 +1,62 @@
+from contextvars import ContextVar, Token
+from typing import Iterable
 from domain.entities.user import User, UserRole
 from domain.entities.student import Student
 from domain.repositories.user_repository import IUserRepository
 from domain.repositories.student_repository import IStudentRepository
 from infrastructure.database.connection import DatabaseConnection
+from infrastructure.security.password_verifier import PasswordVerifier, VerifierOverloaded
+from infrastructure.security.rate_limiter import TokenBucketLimiter
 
 
 class AuthService:
     
-    def __init__(self, user_repo: IUserRepository, student_repo: IStudentRepository):
+    def __init__(self, user_repo: IUserRepository, student_repo: IStudentRepository,
+                 password_verifier: PasswordVerifier | None = None,
+                 user_limiter: TokenBucketLimiter | None = None,
+                 ip_limiter: TokenBucketLimiter | None = None):
         self.user_repo = user_repo
         self.student_repo = student_repo
+        self.password_verifier = password_verifier
+        self.user_limiter = user_limiter
+        self.ip_limiter = ip_limiter
+        # Права на учеников считаются один раз за запрос: списки страниц и проверки
+        # отдельных учеников берут их из этого кэша, а не из базы
+        self._request_cache: ContextVar[dict | None] = ContextVar(f'auth_request_cache_{id(self)}', default=None)
     
-    def authenticate_user(self, username: str, password: str) -> User | None:
+    def begin_request(self) -> Token:
+        return self._request_cache.set({})
+    
+    def end_request(self, token: Token):
+        self._request_cache.reset(token)
+    
+    def authenticate_user(self, username: str, password: str,
+                          remote_addr: str | None = None) -> tuple[User | None, str | None]:
+        # Ограничение частоты срезает работу по хешированию при переборе паролей
+        if self.user_limiter and not self.user_limiter.allow(username.lower()):
+            return None, "Слишком много попыток входа. Попробуйте позже"
+        if self.ip_limiter and remote_addr and not self.ip_limiter.allow(remote_addr):
+            return None, "Слишком много попыток входа. Попробуйте позже"
+        
         user = self.user_repo.get_by_username(username)
-        if user and user.is_active and user.check_password(password):
-            return user
-        return None
+        if not user or not user.is_active:
+            return None, "Неверное имя пользователя или пароль"
+        
+        if self.password_verifier is None:
+            return (user, None) if user.check_password(password) else (None, "Неверное имя пользователя или пароль")
+        
+        try:
+            if not self.password_verifier.verify(user.password_hash, password):
+                return None, "Неверное имя пользователя или пароль"
+            
+            # Параметры хеширования настраиваются централизованно; старые хеши обновляются при входе
+            if self.password_verifier.needs_rehash(user.password_hash):
+                user.password_hash = self.password_verifier.hash(password)
+                self.user_repo.update(user)
+        except VerifierOverloaded:
+            return None, "Сервер перегружен, попробуйте войти через минуту"
+        
+        return user, None
     
     def register_user(self, username: str, email: str, password: str, 
                      first_name: str, last_name: str, role: UserRole) -> tuple[User | None, str | None]:
@@ -37,7 +78,13 @@ class AuthService:
             last_name=last_name,
             is_active=True
         )
-        user.set_password(password)
+        if self.password_verifier is None:
+            user.set_password(password)
+        else:
+            try:
+                user.password_hash = self.password_verifier.hash(password)
+            except VerifierOverloaded:
+                return None, "Сервер перегружен, попробуйте позже"
         
         try:
             user = self.user_repo.create(user)
@@ -52,39 +99,65 @@ class AuthService:
         if user.is_admin():
             return True
             
+        # Школьник — только себя, родитель — своих детей, учитель — назначенные ему классы.
+        # Если список видимых уже загружен в этом запросе — ответ из него, иначе точечный запрос по индексу
+        cache = self._request_cache.get()
+        if cache is not None and ('visible_ids', user.id) in cache:
+            return student_id in cache[('visible_ids', user.id)]
+        return self._cached(('can_view', user.id, student_id), lambda: self._load_can_view(user, student_id))
+    
+    def _load_can_view(self, user: User, student_id: int) -> bool:
         if user.is_student():
-            # Школьник может видеть только свои данные
-            student = self.student_repo.get_by_user_id(user.id)
-            return student and student.id == student_id
-            
+            return self.student_repo.is_owned_by_user(student_id, user.id)
         if user.is_parent():
-            # Родитель может видеть данные своих детей
-            # TODO: Реализовать проверку через ParentChild
-            return True
-            
+            return self.student_repo.has_parent(student_id, user.id)
         if user.is_teacher():
-            # Учитель может видеть всех учеников
-            return True
-            
+            return self.student_repo.is_in_teacher_classes(student_id, user.id)
         return False
     
+    def visible_student_ids(self, user: User) -> frozenset[int]:
+        return self._cached(('visible_ids', user.id if user else None),
+                            lambda: frozenset(student.id for student in self.get_user_students(user)))
+    
     def can_edit_student_data(self, user: User, student_id: int) -> bool:
         if not user or not user.is_active:
             return False
+        # Редактируют админ и учитель — последний только учеников своих классов
+        return user.is_admin() or (user.is_teacher() and self.can_view_student_data(user, student_id))
+    
+    def editable_student_ids(self, user: User, student_ids: Iterable[int]) -> set[int]:
+        # Проверка сразу для всего класса: журнал и перекличка не проверяют учеников по одному
+        if not user or not user.is_active:
+            return set()
             
         if user.is_admin():
-            return True
+            return set(student_ids)
             
         if user.is_teacher():
-            # Учитель может редактировать данные учеников
-            return True
+            # Учитель редактирует данные учеников только назначенных ему классов
+            return set(student_ids) & self.visible_student_ids(user)
             
-        return False
+        return set()
+    
+    def visible_class_names(self, user: User) -> list[str]:
+        # Классы для таблицы класса, журнала и переклички: админ — все, учитель — назначенные
+        if not user or not user.is_active:
+            return []
+        if user.is_admin():
+            return self._cached(('class_names',), self.student_repo.get_class_names)
+        if user.is_teacher():
+            return self._cached(('class_names', user.id), lambda: self.student_repo.get_teacher_class_names(user.id))
+        return []
+    
+    def can_access_class(self, user: User, class_name: str) -> bool:
+        return class_name in self.visible_class_names(user)
     
     def get_user_students(self, user: User) -> list[Student]:
         if not user or not user.is_active:
             return []
-            
+        return list(self._cached(('students', user.id), lambda: self._load_user_students(user)))
+    
+    def _load_user_students(self, user: User) -> list[Student]:
         if user.is_admin():
             # Админ видит всех студентов
             return self.student_repo.get_all()
@@ -96,11 +169,19 @@ class AuthService:
             
         if user.is_parent():
             # Родитель видит своих детей
-            # TODO: Реализовать через ParentChild
-            return self.student_repo.get_all()
+            return self.student_repo.get_by_parent(user.id)
             
         if user.is_teacher():
-            # Учитель видит всех студентов
-            return self.student_repo.get_all()
+            # Учитель видит учеников назначенных ему классов
+            return self.student_repo.get_by_teacher(user.id)
             
         return []
+    
+    def _cached(self, key: tuple, loader):
+        # Вне запроса (скрипты, фоновые задачи) кэша нет и значение считается заново
+        cache = self._request_cache.get()
+        if cache is None:
+            return loader()
+        if key not in cache:
+            cache[key] = loader()
+        return cache[key]
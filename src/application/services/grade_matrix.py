@@ -0,0 +1,62 @@
+from array import array
+from typing import Iterable
+
+
+RECENT_GRADES = 3
+
+
+class GradeMatrix:
+    # Таблица класса «ученики × предметы» в плоских массивах: сумма и число оценок
+    # и последние оценки по каждой ячейке. Ячейка (i, j) — индекс i * число предметов + j
+
+    def __init__(self, student_ids: list[int], subject_ids: list[int], recent: int = RECENT_GRADES):
+        self.student_ids = student_ids
+        self.subject_ids = subject_ids
+        self.recent = recent
+        self._rows = {student_id: i for i, student_id in enumerate(student_ids)}
+        self._columns = {subject_id: j for j, subject_id in enumerate(subject_ids)}
+        size = len(student_ids) * len(subject_ids)
+        self.grade_sums = array('L', [0]) * size
+        self.grade_counts = array('L', [0]) * size
+        # Последние оценки от новой к старой; 0 — оценки нет
+        self.last = array('b', [0]) * (size * recent)
+
+    def _index(self, student_id: int, subject_id: int) -> int | None:
+        i = self._rows.get(student_id)
+        j = self._columns.get(subject_id)
+        if i is None or j is None:
+            return None
+        return i * len(self.subject_ids) + j
+
+    def load(self, cells: Iterable[tuple[int, int, int, int, int | None, int | None]]):
+        for student_id, subject_id, grade_sum, grade_count, position, grade in cells:
+            index = self._index(student_id, subject_id)
+            if index is None:
+                continue
+            self.grade_sums[index] = grade_sum
+            self.grade_counts[index] = grade_count
+            if position is not None and position <= self.recent:
+                self.last[index * self.recent + position - 1] = grade
+        return self
+
+    def count(self, i: int, j: int) -> int:
+        return self.grade_counts[i * len(self.subject_ids) + j]
+
+    def average(self, i: int, j: int) -> float | None:
+        index = i * len(self.subject_ids) + j
+        count = self.grade_counts[index]
+        return self.grade_sums[index] / count if count else None
+
+    def last_grades(self, i: int, j: int) -> list[int]:
+        start = (i * len(self.subject_ids) + j) * self.recent
+        return [grade for grade in self.last[start:start + self.recent] if grade]
+
+    def row_average(self, i: int) -> float | None:
+        start, end = i * len(self.subject_ids), (i + 1) * len(self.subject_ids)
+        count = sum(self.grade_counts[start:end])
+        return sum(self.grade_sums[start:end]) / count if count else None
+
+    def column_average(self, j: int) -> float | None:
+        step = len(self.subject_ids)
+        count = sum(self.grade_counts[j::step])
+        return sum(self.grade_sums[j::step]) / count if count else None
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from domain.entities.grade import GRADE_VALUES
+
+
+GROUP_BY = ('student', 'subject', 'class')
+MOVING_AVERAGE_WINDOW = 5
+PERCENTILES = (25, 50, 75, 90)
+
+# Колонки оценок: ученик, предмет, день (юлианский), оценка
+GRADE_DTYPE = np.dtype([('student_id', 'i4'), ('subject_id', 'i4'), ('day', 'i4'), ('grade', 'i1')])
+
+
+@dataclass
+class GradeStats:
+    key: int | str
+    count: int
+    mean: float
+    std: float
+    median: float
+    percentiles: dict[int, float]
+    distribution: dict[int, int]
+    moving_average: float
+    trend_per_month: float
+
+
+def load_grade_columns(rows: Iterable[tuple[int, int, int, int]]) -> np.ndarray:
+    # Строки курсора складываются сразу в колоночный массив, без промежуточных объектов Grade
+    return np.fromiter(rows, dtype=GRADE_DTYPE)
+
+
+def select_students(columns: np.ndarray, student_ids: Iterable[int]) -> np.ndarray:
+    return columns[np.isin(columns['student_id'], np.fromiter(student_ids, dtype=np.int64))]
+
+
+def map_students(columns: np.ndarray, student_groups: dict[int, int]) -> np.ndarray:
+    # Номер группы (например, класса) для каждой оценки через таблицу student_id -> группа
+    lookup = np.full(max(student_groups, default=0) + 1, -1, dtype=np.int64)
+    lookup[np.fromiter(student_groups.keys(), dtype=np.int64)] = np.fromiter(student_groups.values(), dtype=np.int64)
+    return lookup[columns['student_id']]
+
+
+def compute_grade_statistics(columns: np.ndarray, group_ids: np.ndarray,
+                             window: int = MOVING_AVERAGE_WINDOW) -> dict[int, GradeStats]:
+    # Все показатели считаются сразу для всех групп: данные сортируются по группе,
+    # после чего каждая метрика — это reduceat по границам групп
+    if len(columns) == 0:
+        return {}
+
+    grades = columns['grade'].astype(np.float64)
+    days = columns['day'].astype(np.float64)
+
+    # Порядок по группе и дате — для скользящего среднего и тренда
+    order = np.lexsort((days, group_ids))
+    keys = group_ids[order]
+    grades_by_date = grades[order]
+    days_by_date = days[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    counts = ends - starts
+    group_keys = keys[starts]
+
+    sums = np.add.reduceat(grades_by_date, starts)
+    means = sums / counts
+    squares = np.add.reduceat(grades_by_date ** 2, starts)
+    stds = np.sqrt(np.maximum(squares / counts - means ** 2, 0.0))
+
+    # Распределение 2..5: одна bincount по (номер группы, оценка)
+    group_index = np.repeat(np.arange(len(starts)), counts)
+    grade_index = np.clip(grades_by_date.astype(np.int64) - GRADE_VALUES[0], 0, len(GRADE_VALUES) - 1)
+    distribution = np.bincount(
+        group_index * len(GRADE_VALUES) + grade_index, minlength=len(starts) * len(GRADE_VALUES)
+    ).reshape(len(starts), len(GRADE_VALUES))
+
+    # Перцентили с линейной интерполяцией по отсортированным внутри группы оценкам
+    grades_sorted = grades[np.lexsort((grades, group_ids))]
+    percentiles = {}
+    for p in PERCENTILES:
+        position = (counts - 1) * (p / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        percentiles[p] = (grades_sorted[starts + lower] * (1 - fraction)
+                          + grades_sorted[starts + upper] * fraction)
+
+    # Скользящее среднее последних window оценок через накопленные суммы
+    cumulative = np.r_[0.0, np.cumsum(grades_by_date)]
+    window_sizes = np.minimum(counts, window)
+    moving = (cumulative[ends] - cumulative[ends - window_sizes]) / window_sizes
+
+    # Наклон МНК оценки по времени; дни отсчитываются от начала группы ради точности
+    x = days_by_date - np.repeat(days_by_date[starts], counts)
+    sum_x = np.add.reduceat(x, starts)
+    sum_xx = np.add.reduceat(x * x, starts)
+    sum_xy = np.add.reduceat(x * grades_by_date, starts)
+    denominator = counts * sum_xx - sum_x ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slopes = np.where(denominator > 0, (counts * sum_xy - sum_x * sums) / denominator, 0.0)
+
+    return {
+        int(group_keys[i]): GradeStats(
+            key=int(group_keys[i]),
+            count=int(counts[i]),
+            mean=float(means[i]),
+            std=float(stds[i]),
+            median=float(percentiles[50][i]),
+            percentiles={p: float(values[i]) for p, values in percentiles.items()},
+            distribution={grade: int(distribution[i, j]) for j, grade in enumerate(GRADE_VALUES)},
+            moving_average=float(moving[i]),
+            trend_per_month=float(slopes[i] * 30)
+        )
+        for i in range(len(starts))
+    }
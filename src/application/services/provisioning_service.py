@@ -0,0 +1,113 @@
+import time
+from typing import Callable, Iterable, Iterator
+from domain.entities.user import User, UserRole, ParentChild
+from domain.entities.student import Student
+from domain.repositories.user_repository import IUserRepository
+from domain.repositories.student_repository import IStudentRepository
+from domain.repositories.parent_child_repository import IParentChildRepository
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.security.password_hasher import PasswordHasher
+
+
+def _chunks(records: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ProvisioningService:
+
+    def __init__(self,
+                 user_repo: IUserRepository,
+                 student_repo: IStudentRepository,
+                 parent_child_repo: IParentChildRepository,
+                 password_hasher: PasswordHasher,
+                 db_connection: DatabaseConnection):
+        self.db = db_connection
+        self.user_repo = user_repo
+        self.student_repo = student_repo
+        self.parent_child_repo = parent_child_repo
+        self.password_hasher = password_hasher
+
+    def provision_users(self, records: Iterable[dict], batch_size: int = 500,
+                        report: Callable[[str], None] | None = None) -> dict[str, int]:
+        # Запись: username, email, password, role, first_name, last_name,
+        # class_name (для школьников) и children — логины детей-школьников (для родителей)
+        started = time.perf_counter()
+        counts = {'users': 0, 'students': 0, 'parent_child': 0, 'unresolved_children': 0}
+        student_ids: dict[str, int] = {}
+        pending_links: list[tuple[int, str]] = []
+
+        for batch in _chunks(records, batch_size):
+            hashes = self.password_hasher.hash_many([record['password'] for record in batch])
+            # Пользователи пачки и их профили учеников пишутся одной транзакцией:
+            # сбой не оставит пользователей без профилей
+            with self.db.write_transaction():
+                users = self.user_repo.create_many([
+                    User(
+                        id=None,
+                        username=record['username'],
+                        email=record['email'],
+                        password_hash=password_hash,
+                        role=UserRole(record['role']),
+                        first_name=record['first_name'],
+                        last_name=record['last_name'],
+                        is_active=True
+                    )
+                    for record, password_hash in zip(batch, hashes)
+                ])
+
+                students = []
+                batch_links = []
+                for record, user in zip(batch, users):
+                    if user.is_student() and record.get('class_name'):
+                        students.append(Student(
+                            id=None,
+                            name=record.get('student_name') or f"{user.first_name} {user.last_name}",
+                            class_name=record['class_name'],
+                            user_id=user.id
+                        ))
+                    if user.is_parent():
+                        batch_links.extend((user.id, child) for child in record.get('children') or [])
+
+                self.student_repo.create_many(students)
+
+            # Состояние обновляется только после фиксации пачки
+            usernames = {user.id: user.username for user in users}
+            student_ids.update((usernames[student.user_id], student.id) for student in students)
+            pending_links.extend(batch_links)
+            counts['users'] += len(users)
+            counts['students'] += len(students)
+            if report:
+                elapsed = time.perf_counter() - started
+                report(f"Создано пользователей: {counts['users']} ({counts['users'] / elapsed:.0f} в секунду)")
+
+        # Связи разрешаются в конце: ребёнок может оказаться в более поздней пачке или уже быть в базе
+        links = []
+        unresolved = []
+        for parent_id, child_username in pending_links:
+            child_id = student_ids.get(child_username) or self._find_student_id(child_username)
+            if child_id is None:
+                unresolved.append(child_username)
+            else:
+                links.append(ParentChild(id=None, parent_id=parent_id, child_id=child_id))
+        with self.db.write_transaction():
+            counts['parent_child'] = self.parent_child_repo.create_many(links)
+        
+        counts['unresolved_children'] = len(unresolved)
+        if unresolved and report:
+            shown = ', '.join(sorted(set(unresolved))[:20])
+            report(f"⚠️ Не найдены ученики для связей родитель-ребенок ({len(unresolved)}): {shown}")
+        return counts
+
+    def _find_student_id(self, username: str) -> int | None:
+        user = self.user_repo.get_by_username(username)
+        if not user:
+            return None
+        student = self.student_repo.get_by_user_id(user.id)
+        return student.id if student else None
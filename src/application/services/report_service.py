@@ -0,0 +1,107 @@
+import csv
+import io
+from typing import Any, Iterator
+from domain.entities.student import Student
+from domain.entities.subject import Subject
+from domain.repositories.report_repository import IReportRepository
+from domain.repositories.subject_repository import ISubjectRepository
+from application.services.auth_service import AuthService
+
+
+CSV_HEADER = ['Предмет', 'Ученик', 'Класс', 'Дата', 'Оценка', 'Посещаемость', 'Комментарий']
+CSV_CHUNK_ROWS = 500
+
+
+class ReportService:
+    
+    def __init__(self,
+                 report_repo: IReportRepository,
+                 subject_repo: ISubjectRepository,
+                 auth_service: AuthService):
+        self.report_repo = report_repo
+        self.subject_repo = subject_repo
+        self.auth_service = auth_service
+    
+    def can_view_reports(self, current_user) -> bool:
+        if not current_user or not hasattr(current_user, 'id'):
+            return False
+        return current_user.is_teacher() or current_user.is_parent() or current_user.is_admin()
+    
+    def get_subjects(self) -> list[Subject]:
+        return self.subject_repo.get_all()
+    
+    def get_subject_report(self, subject_id: int, current_user) -> dict[str, Any] | None:
+        if not self.can_view_reports(current_user):
+            return None
+        
+        students = {student.id: student for student in self.auth_service.get_user_students(current_user)}
+        # Ячейки по датам и итоги по ученику считает база и только для видимых учеников
+        days = self.report_repo.get_subject_days(subject_id, students)
+        totals = self.report_repo.get_subject_totals(subject_id, students)
+        
+        dates = set()
+        students_data = {}
+        for student_id, day, grade, present in days:
+            entry = students_data.setdefault(student_id, {'student': students[student_id], 'dates': {}})
+            cell = entry['dates'].setdefault(day, {'grade': None, 'present': None})
+            dates.add(day)
+            if grade is not None:
+                cell['grade'] = grade
+            else:
+                cell['present'] = bool(present)
+        
+        total = {'grade_count': 0, 'present': 0, 'absent': 0}
+        for student_id, entry in students_data.items():
+            grade_sum, grade_count, present, absent = totals.get(student_id, (0, 0, 0, 0))
+            entry.update(grade_sum=grade_sum, grade_count=grade_count, present=present, absent=absent)
+            entry['average'] = grade_sum / grade_count if grade_count else None
+            entry['attendance_rate'] = present / (present + absent) if present + absent else None
+            total['grade_count'] += grade_count
+            total['present'] += present
+            total['absent'] += absent
+        
+        marks = total['present'] + total['absent']
+        return {
+            'dates': sorted(dates),
+            'students_data': dict(sorted(
+                students_data.items(),
+                key=lambda item: (item[1]['student'].class_name, item[1]['student'].name, item[0])
+            )),
+            'total_grades': total['grade_count'],
+            'attendance_rate': total['present'] / marks if marks else None
+        }
+    
+    def iter_csv(self, subject_id: int | None, current_user) -> Iterator[str] | None:
+        # Выгрузка идёт прямо с курсора кусками по CSV_CHUNK_ROWS строк,
+        # поэтому даже журнал всей школы не собирается в памяти целиком
+        if not self.can_view_reports(current_user):
+            return None
+        students = {student.id: student for student in self.auth_service.get_user_students(current_user)}
+        return self._generate_csv(subject_id, students, self.subject_repo.get_all_by_id())
+    
+    def _generate_csv(self, subject_id: int | None, students: dict[int, Student],
+                      subjects: dict[int, Subject]) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # BOM нужен Excel, чтобы распознать UTF-8 и показать кириллицу
+        buffer.write('\ufeff')
+        writer.writerow(CSV_HEADER)
+        rows = 0
+        # Строки идут по ученикам, внутри — по предметам и датам; имена подставляются из памяти
+        for row in self.report_repo.iter_subject_journal(students, subject_id):
+            student = students[row['student_id']]
+            subject = subjects.get(row['subject_id'])
+            if row['grade'] is not None:
+                grade, presence = row['grade'], ''
+            else:
+                grade, presence = '', 'присутствовал' if row['present'] else 'отсутствовал'
+            writer.writerow([
+                subject.name if subject else '', student.name, student.class_name,
+                row['date'].strftime('%d.%m.%Y'), grade, presence, row['note'] or ''
+            ])
+            rows += 1
+            if rows % CSV_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
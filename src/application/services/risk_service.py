@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import time
+
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator
+from domain.entities.student_risk import StudentRisk
+from domain.repositories.risk_repository import IRiskRepository
+from application.services.auth_service import AuthService
+
+
+RISK_WINDOW_DAYS = 120
+
+# Вклад признаков в итоговый балл риска (0..100)
+RISK_WEIGHTS = {
+    'low_average': 0.35,
+    'falling_trend': 0.25,
+    'absence_rate': 0.25,
+    'absence_streak': 0.15,
+}
+LOW_AVERAGE_THRESHOLD = 4.0     # ниже — риск растёт, при среднем 2.0 — максимален
+FALLING_TREND_LIMIT = 1.0       # падение на балл в месяц — максимальный риск по тренду
+ABSENCE_RATE_LIMIT = 0.3        # 30% пропусков — максимальный риск по посещаемости
+ABSENCE_STREAK_LIMIT = 5        # пять пропусков подряд в конце периода
+
+Event = tuple[int, date, int, int | None, bool | None]
+
+
+def _trend_per_month(grades: list[tuple[date, int]]) -> float:
+    if len(grades) < 2:
+        return 0.0
+    origin = grades[0][0]
+    xs = [(day - origin).days for day, _ in grades]
+    ys = [grade for _, grade in grades]
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance * 30
+
+
+def score_student(student_id: int, grades: list[tuple[date, int]],
+                  marks: list[tuple[date, bool]], computed_at: datetime) -> StudentRisk:
+    # grades и marks упорядочены по дате
+    average = sum(grade for _, grade in grades) / len(grades) if grades else None
+    trend = _trend_per_month(grades)
+    absences = sum(1 for _, present in marks if not present)
+    absence_rate = absences / len(marks) if marks else None
+    streak = 0
+    for _, present in reversed(marks):
+        if present:
+            break
+        streak += 1
+
+    factors = {
+        'low_average': (min(1.0, max(0.0, (LOW_AVERAGE_THRESHOLD - average) / (LOW_AVERAGE_THRESHOLD - 2)))
+                        if average is not None else 0.0),
+        'falling_trend': min(1.0, max(0.0, -trend / FALLING_TREND_LIMIT)),
+        'absence_rate': min(1.0, absence_rate / ABSENCE_RATE_LIMIT) if absence_rate is not None else 0.0,
+        'absence_streak': min(1.0, streak / ABSENCE_STREAK_LIMIT),
+    }
+    reasons = []
+    if factors['low_average'] > 0:
+        reasons.append(f'Средний балл {average:.2f}')
+    if factors['falling_trend'] > 0:
+        reasons.append(f'Оценки снижаются на {-trend:.2f} в месяц')
+    if factors['absence_rate'] > 0:
+        reasons.append(f'Пропущено {absence_rate:.0%} уроков')
+    if streak >= 2:
+        reasons.append(f'Пропуски подряд: {streak}')
+
+    return StudentRisk(
+        student_id=student_id,
+        score=round(100 * sum(RISK_WEIGHTS[name] * value for name, value in factors.items()), 1),
+        average=average,
+        trend=trend,
+        absence_rate=absence_rate,
+        absence_streak=streak,
+        reasons=reasons,
+        computed_at=computed_at
+    )
+
+
+def score_events(events: Iterator[Event], computed_at: datetime) -> Iterator[StudentRisk]:
+    # Поток событий упорядочен по ученику: в памяти только история текущего ученика
+    for student_id, student_events in itertools.groupby(events, key=lambda event: event[0]):
+        grades, marks = [], []
+        for _, day, _, grade, present in student_events:
+            if grade is not None:
+                grades.append((day, grade))
+            else:
+                marks.append((day, present))
+        yield score_student(student_id, grades, marks, computed_at)
+
+
+def merge_events(risk_repo: IRiskRepository, since: date,
+                 partition: tuple[int, int] | None = None) -> Iterator[Event]:
+    # Слияние двух упорядоченных курсоров вместо сортировки объединения в SQLite
+    grades = ((student_id, day, 0, grade, None)
+              for student_id, day, grade in risk_repo.iter_grades(since, partition))
+    marks = ((student_id, day, 1, None, present)
+             for student_id, day, present in risk_repo.iter_attendance(since, partition))
+    return heapq.merge(grades, marks, key=lambda event: event[:3])
+
+
+def _score_partition(db_path: str, since: date, computed_at: datetime,
+                     partition: tuple[int, int]) -> list[StudentRisk]:
+    # Выполняется в дочернем процессе: своё соединение, своя часть учеников
+    from infrastructure.database.connection import DatabaseConnection
+    from infrastructure.repositories.risk_repository import RiskRepository
+
+    db = DatabaseConnection(db_path, pool_size=1)
+    try:
+        return list(score_events(merge_events(RiskRepository(db), since, partition), computed_at))
+    finally:
+        db.close_all()
+
+
+class RiskService:
+
+    def __init__(self, risk_repo: IRiskRepository, auth_service: AuthService, db_path: str | None = None):
+        self.risk_repo = risk_repo
+        self.auth_service = auth_service
+        self.db_path = db_path
+
+    def run_scoring(self, window_days: int = RISK_WINDOW_DAYS, workers: int | None = None,
+                    report: Callable[[str], None] | None = None) -> int:
+        started = time.perf_counter()
+        since = date.today() - timedelta(days=window_days)
+        computed_at = datetime.utcnow()
+
+        if workers and workers > 1 and self.db_path:
+            # Ученики делятся по student_id % workers; каждый процесс читает только свою часть
+            from concurrent.futures import ProcessPoolExecutor
+            
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = pool.map(_score_partition, itertools.repeat(self.db_path), itertools.repeat(since),
+                                 itertools.repeat(computed_at), [(workers, index) for index in range(workers)])
+                risks = [risk for part in parts for risk in part]
+        else:
+            risks = list(score_events(merge_events(self.risk_repo, since), computed_at))
+
+        count = self.risk_repo.replace_all(risks)
+        if report:
+            report(f"Оценено учеников: {count} за {time.perf_counter() - started:.1f} с")
+        return count
+
+    def get_at_risk_students(self, current_user, limit: int | None = None) -> list[StudentRisk] | None:
+        if not current_user or not hasattr(current_user, 'id'):
+            return None
+        if not (current_user.is_teacher() or current_user.is_admin()):
+            return None
+
+        students = {student.id: student for student in self.auth_service.get_user_students(current_user)}
+        risks = []
+        for risk in self.risk_repo.get_top():
+            risk.student = students.get(risk.student_id)
+            if risk.student is not None:
+                risks.append(risk)
+                if limit is not None and len(risks) >= limit:
+                    break
+        return risks
@@ -1,7 +1,7 @@
 from typing import Any
 from datetime import date
 from domain.entities.student import Student
-from domain.entities.grade import Grade
+from domain.entities.grade import Grade, GRADE_VALUES
 from domain.entities.attendance import Attendance
 from domain.entities.schedule import Schedule
 from domain.entities.subject import Subject
@@ -10,7 +10,29 @@ from domain.repositories.grade_repository import IGradeRepository
 from domain.repositories.attendance_repository import IAttendanceRepository
 from domain.repositories.schedule_repository import IScheduleRepository
 from domain.repositories.subject_repository import ISubjectRepository
+from domain.repositories.stats_repository import IStatsRepository
+from domain.entities.subject_stats import StudentStats
 from application.services.auth_service import AuthService
+from application.services.grade_matrix import GradeMatrix
+
+
+DIARY_PAGE_SIZE = 50
+DIARY_TABS = ('grades', 'attendance', 'schedule')
+
+
+def encode_cursor(item: Grade | Attendance) -> str:
+    return f"{item.date.isoformat()}:{item.id}"
+
+
+def decode_cursor(value: str | None) -> tuple[date, int] | None:
+    # Курсор страницы — дата и id последней показанной записи: «2024-05-20:1534»
+    if not value:
+        return None
+    try:
+        day, item_id = value.split(':')
+        return date.fromisoformat(day), int(item_id)
+    except ValueError:
+        return None
 
 
 class StudentService:
@@ -21,12 +43,14 @@ class StudentService:
                  attendance_repo: IAttendanceRepository,
                  schedule_repo: IScheduleRepository,
                  subject_repo: ISubjectRepository,
+                 stats_repo: IStatsRepository,
                  auth_service: AuthService):
         self.student_repo = student_repo
         self.grade_repo = grade_repo
         self.attendance_repo = attendance_repo
         self.schedule_repo = schedule_repo
         self.subject_repo = subject_repo
+        self.stats_repo = stats_repo
         self.auth_service = auth_service
     
     def get_all_students(self, current_user) -> list[Student]:
@@ -34,10 +58,82 @@ class StudentService:
             return []
         return self.auth_service.get_user_students(current_user)
     
+    def get_students_stats(self, students: list[Student]) -> dict[int, StudentStats]:
+        # Средний балл и посещаемость для списка учеников одним запросом
+        return self.stats_repo.get_by_students([student.id for student in students])
+    
+    def get_grade_statistics(self, current_user, group_by: str = 'student',
+                             subject_id: int | None = None) -> list[dict[str, Any]] | None:
+        # Медианы, перцентили, разброс, тренд и распределение оценок по ученикам,
+        # предметам или классам — векторно по оценкам видимых пользователю учеников.
+        # numpy загружается при первом запросе статистики, а не при старте процесса
+        from application.services.grade_statistics import (
+            GROUP_BY, load_grade_columns, select_students, map_students, compute_grade_statistics
+        )
+        
+        if not current_user or not hasattr(current_user, 'id'):
+            return None
+        if not (current_user.is_teacher() or current_user.is_parent() or current_user.is_admin()):
+            return None
+        if group_by not in GROUP_BY:
+            group_by = 'student'
+        
+        students = {student.id: student for student in self.auth_service.get_user_students(current_user)}
+        if current_user.is_admin():
+            # Админу видны все ученики: одно чтение всех оценок без списка id в запросе
+            columns = select_students(load_grade_columns(self.grade_repo.iter_statistics_rows(None, subject_id)), students)
+        else:
+            columns = load_grade_columns(self.grade_repo.iter_statistics_rows(students, subject_id))
+        
+        if group_by == 'student':
+            group_ids = columns['student_id']
+            labels = {student.id: f"{student.name} ({student.class_name})" for student in students.values()}
+        elif group_by == 'subject':
+            group_ids = columns['subject_id']
+            labels = {subject.id: subject.name for subject in self.subject_repo.get_all()}
+        else:
+            class_names = sorted({student.class_name for student in students.values()})
+            class_index = {name: index for index, name in enumerate(class_names)}
+            group_ids = map_students(columns, {student.id: class_index[student.class_name]
+                                               for student in students.values()})
+            labels = dict(enumerate(class_names))
+        
+        statistics = compute_grade_statistics(columns, group_ids)
+        return sorted(
+            ({'label': labels.get(key, str(key)), 'stats': stats} for key, stats in statistics.items()),
+            key=lambda row: row['label']
+        )
+    
+    def get_students_version(self, current_user) -> tuple | None:
+        # Версия данных списков учеников (главная, отчёты): состав видимых учеников,
+        # их версии и справочники. Считается без чтения оценок и посещаемости
+        if not current_user or not hasattr(current_user, 'id'):
+            return None
+        student_ids = tuple(student.id for student in self.auth_service.get_user_students(current_user))
+        return student_ids, self.stats_repo.get_students_version(list(student_ids)), self._get_reference_version()
+    
+    def get_diary_version(self, student_id: int, current_user) -> tuple | None:
+        if not current_user or not hasattr(current_user, 'id'):
+            return None
+        if not self.auth_service.can_view_student_data(current_user, student_id):
+            return None
+        return student_id, self.stats_repo.get_students_version([student_id]), self._get_reference_version()
+    
+    def _get_reference_version(self) -> tuple:
+        # Предметы и расписание берутся из кэша справочников, поэтому сравниваются по содержимому
+        return (
+            tuple((subject.id, subject.name, subject.teacher) for subject in self.subject_repo.get_all()),
+            tuple((lesson.id, lesson.subject_id, lesson.day_of_week, lesson.time_start, lesson.time_end,
+                   lesson.classroom) for lesson in self.schedule_repo.get_all())
+        )
+    
     def get_student_by_id(self, student_id: int) -> Student | None:
         return self.student_repo.get_by_id(student_id)
     
-    def get_student_diary_data(self, student_id: int, current_user) -> dict[str, Any] | None:
+    def get_student_diary_data(self, student_id: int, current_user, tab: str = 'grades',
+                               before: tuple[date, int] | None = None,
+                               date_from: date | None = None,
+                               date_to: date | None = None) -> dict[str, Any] | None:
         if not current_user or not hasattr(current_user, 'id'):
             return None
             
@@ -47,34 +143,39 @@ class StudentService:
         student = self.student_repo.get_by_id(student_id)
         if not student:
             return None
-            
-        grades = self.grade_repo.get_by_student(student_id)
-        attendance = self.attendance_repo.get_by_student(student_id)
-        schedule = self.schedule_repo.get_all()
-        subjects = self.subject_repo.get_all()
         
-        # Создаем словарь предметов для быстрого поиска
-        subjects_dict = {subject.id: subject for subject in subjects}
+        if tab not in DIARY_TABS:
+            tab = 'grades'
         
-        # Добавляем объект предмета к каждой оценке
-        for grade in grades:
-            grade.subject = subjects_dict.get(grade.subject_id)
+        # Загружаем только активную вкладку; остальные подгружаются отдельными запросами
+        data = {
+            'student': student,
+            'tab': tab,
+            'subjects': self.subject_repo.get_all(),
+            'date_from': date_from,
+            'date_to': date_to
+        }
+        subjects_dict = self.subject_repo.get_all_by_id()
         
-        # Добавляем объект предмета к каждой записи посещаемости
-        for att in attendance:
-            att.subject = subjects_dict.get(att.subject_id)
+        if tab == 'schedule':
+            schedule = self.schedule_repo.get_all()
+            # Добавляем объект предмета к каждому элементу расписания
+            for sched in schedule:
+                sched.subject = subjects_dict.get(sched.subject_id)
+            data['schedule'] = schedule
+            return data
         
-        # Добавляем объект предмета к каждому элементу расписания
-        for sched in schedule:
-            sched.subject = subjects_dict.get(sched.subject_id)
+        repo = self.grade_repo if tab == 'grades' else self.attendance_repo
+        # Запрашиваем на одну запись больше страницы, чтобы узнать, есть ли продолжение
+        items = repo.get_page_by_student(student_id, DIARY_PAGE_SIZE + 1, before, date_from, date_to)
+        data[f'{tab}_next'] = encode_cursor(items[DIARY_PAGE_SIZE - 1]) if len(items) > DIARY_PAGE_SIZE else None
+        items = items[:DIARY_PAGE_SIZE]
         
-        return {
-            'student': student,
-            'grades': grades,
-            'attendance': attendance,
-            'schedule': schedule,
-            'subjects': subjects
-        }
+        # Добавляем объект предмета к каждой оценке или записи посещаемости
+        for item in items:
+            item.subject = subjects_dict.get(item.subject_id)
+        data[tab] = items
+        return data
     
     def add_grade(self, student_id: int, subject_id: int, grade: int, 
                   comment: str, current_user) -> Grade | None:
@@ -95,6 +196,102 @@ class StudentService:
         
         return self.grade_repo.create(new_grade)
     
+    def get_gradebook_data(self, class_name: str, subject_id: int | None, current_user) -> dict[str, Any] | None:
+        if not self._can_open_class(class_name, current_user):
+            return None
+            
+        subjects = self.subject_repo.get_all()
+        selected_subject = next((s for s in subjects if s.id == subject_id), None)
+        students = self.student_repo.get_by_class(class_name) if class_name else []
+        
+        return {
+            'class_names': self.auth_service.visible_class_names(current_user),
+            'class_name': class_name,
+            'subjects': subjects,
+            'selected_subject': selected_subject,
+            'students': students
+        }
+    
+    def get_class_matrix_key(self, class_name: str, current_user) -> tuple | None:
+        # Ключ готового представления таблицы класса: меняется вместе с данными учеников
+        # класса или списком предметов, поэтому кэш не требует явного сброса
+        if not self._can_open_class(class_name, current_user):
+            return None
+            
+        subjects = tuple((subject.id, subject.name) for subject in self.subject_repo.get_all())
+        return class_name, self.stats_repo.get_class_version(class_name), subjects
+    
+    def get_class_matrix_data(self, class_name: str, current_user) -> dict[str, Any] | None:
+        if not class_name or not self._can_open_class(class_name, current_user):
+            return None
+            
+        subjects = self.subject_repo.get_all()
+        students = self.student_repo.get_by_class(class_name)
+        matrix = GradeMatrix([student.id for student in students], [subject.id for subject in subjects])
+        if students:
+            matrix.load(self.stats_repo.get_class_cells(class_name, matrix.recent))
+        
+        return {
+            'class_name': class_name,
+            'subjects': subjects,
+            'students': students,
+            'matrix': matrix
+        }
+    
+    def get_class_names(self, current_user) -> list[str]:
+        return self.auth_service.visible_class_names(current_user)
+    
+    def _can_open_class(self, class_name: str, current_user) -> bool:
+        # Таблица класса, журнал и перекличка: учитель — только назначенные классы, админ — любые.
+        # Пустой class_name — страница выбора класса
+        if not current_user or not hasattr(current_user, 'id'):
+            return False
+        if not (current_user.is_teacher() or current_user.is_admin()):
+            return False
+        return not class_name or self.auth_service.can_access_class(current_user, class_name)
+    
+    def add_grades_bulk(self, class_name: str, subject_id: int, grade_date: date,
+                        rows: dict[int, tuple[str, str]], current_user) -> tuple[int, dict[int, str]] | None:
+        # Журнал класса: все оценки сохраняются одной транзакцией либо не сохраняются вовсе,
+        # а ошибки по строкам возвращаются вместе, чтобы учитель исправил их за один раз
+        if not class_name or not self._can_open_class(class_name, current_user):
+            return None
+            
+        if not self.subject_repo.get_by_id(subject_id):
+            return None
+            
+        class_students = {student.id for student in self.student_repo.get_by_class(class_name)}
+        editable = self.auth_service.editable_student_ids(current_user, class_students)
+        
+        new_grades = []
+        errors = {}
+        for student_id, (raw_grade, comment) in rows.items():
+            raw_grade = raw_grade.strip()
+            if not raw_grade:
+                continue
+            if student_id not in class_students:
+                errors[student_id] = 'Ученик не найден в классе'
+                continue
+            if student_id not in editable:
+                errors[student_id] = 'Нет прав для выставления оценки'
+                continue
+            if not raw_grade.isdigit() or int(raw_grade) not in GRADE_VALUES:
+                errors[student_id] = 'Оценка должна быть от 2 до 5'
+                continue
+            new_grades.append(Grade(
+                id=None,
+                student_id=student_id,
+                subject_id=subject_id,
+                grade=int(raw_grade),
+                date=grade_date,
+                comment=comment.strip()
+            ))
+        
+        if errors:
+            return 0, errors
+            
+        return self.grade_repo.create_many(new_grades), {}
+    
     def add_attendance(self, student_id: int, subject_id: int, present: bool, 
                       reason: str, current_user) -> Attendance | None:
         if not current_user or not hasattr(current_user, 'id'):
@@ -114,3 +311,65 @@ class StudentService:
         
         return self.attendance_repo.create(new_attendance)
     
+    def get_roll_call_data(self, class_name: str, subject_id: int | None, lesson_date: date,
+                           current_user) -> dict[str, Any] | None:
+        if not self._can_open_class(class_name, current_user):
+            return None
+            
+        subjects = self.subject_repo.get_all()
+        subjects_dict = {subject.id: subject for subject in subjects}
+        students = self.student_repo.get_by_class(class_name) if class_name else []
+        
+        # Уроки в день переклички — быстрый выбор предмета по расписанию
+        lessons = self.schedule_repo.get_by_day(lesson_date.weekday())
+        for lesson in lessons:
+            lesson.subject = subjects_dict.get(lesson.subject_id)
+        
+        marks = {}
+        if students and subject_id in subjects_dict:
+            class_students = {student.id for student in students}
+            marks = {
+                record.student_id: record
+                for record in self.attendance_repo.get_by_lesson(subject_id, lesson_date)
+                if record.student_id in class_students
+            }
+        
+        return {
+            'class_names': self.auth_service.visible_class_names(current_user),
+            'class_name': class_name,
+            'subjects': subjects,
+            'selected_subject': subjects_dict.get(subject_id),
+            'lesson_date': lesson_date,
+            'lessons': lessons,
+            'students': students,
+            'marks': marks
+        }
+    
+    def record_roll_call(self, class_name: str, subject_id: int, lesson_date: date,
+                         marks: dict[int, tuple[bool, str]], current_user) -> int | None:
+        if not class_name or not self._can_open_class(class_name, current_user):
+            return None
+            
+        if not self.subject_repo.get_by_id(subject_id):
+            return None
+            
+        class_students = {student.id for student in self.student_repo.get_by_class(class_name)}
+        editable = self.auth_service.editable_student_ids(current_user, class_students)
+        
+        records = []
+        for student_id, (present, reason) in marks.items():
+            if student_id not in class_students:
+                continue
+            if student_id not in editable:
+                return None
+            records.append(Attendance(
+                id=None,
+                student_id=student_id,
+                subject_id=subject_id,
+                date=lesson_date,
+                present=present,
+                reason='' if present else reason.strip()
+            ))
+        
+        return self.attendance_repo.create_many(records)
+    
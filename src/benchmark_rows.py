@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.database.migrations import INDEXES_V2_SQL, TABLES_V1_SQL
+from infrastructure.repositories.grade_repository import GradeRepository
+
+
+@dataclass
+class LegacyGrade:
+    # Сущность и отображение строки в том виде, как они были до конвертеров и __slots__
+    id: int | None
+    student_id: int
+    subject_id: int
+    grade: int
+    date: date
+    comment: str | None = None
+
+
+def legacy_load(db_path: str, student_id: int) -> list[LegacyGrade]:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("SELECT * FROM grades WHERE student_id = ? ORDER BY date DESC", (student_id,)).fetchall()
+        return [
+            LegacyGrade(
+                id=row['id'],
+                student_id=row['student_id'],
+                subject_id=row['subject_id'],
+                grade=row['grade'],
+                date=date.fromisoformat(row['date']),
+                comment=row['comment']
+            )
+            for row in rows
+        ]
+    finally:
+        conn.close()
+
+
+def seed(db_path: str, rows: int):
+    conn = sqlite3.connect(db_path)
+    # Таблицы и индексы без триггеров агрегатов: заполнение не должно их пересчитывать
+    conn.executescript(TABLES_V1_SQL)
+    conn.executescript(INDEXES_V2_SQL)
+    start = date(2024, 9, 1)
+    conn.executemany(
+        "INSERT INTO grades (student_id, subject_id, grade, date, comment) VALUES (1, ?, ?, ?, '')",
+        ((random.randint(1, 12), random.randint(2, 5), (start + timedelta(days=i % 270)).isoformat())
+         for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(label: str, load, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items = load()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    items = load()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rate = len(items) / best
+    print(f"{label:<12} {len(items):>9} строк  {rate:>12,.0f} строк/с  {memory / len(items):>6.0f} байт/строка")
+    return rate
+
+
+def benchmark(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'benchmark.db')
+        seed(db_path, rows)
+        db = DatabaseConnection(db_path, pool_size=1)
+        repository = GradeRepository(db)
+        try:
+            legacy = measure('Row + имена', lambda: legacy_load(db_path, 1), repeat)
+            current = measure('Кортежи', lambda: repository.get_by_student(1), repeat)
+        finally:
+            db.close_all()
+    print(f"Ускорение: {current / legacy:.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Скорость отображения строк оценок в сущности')
+    parser.add_argument('--rows', type=int, default=200000, help='Количество оценок в тестовой базе')
+    parser.add_argument('--repeat', type=int, default=5, help='Число повторов, берётся лучшее время')
+    args = parser.parse_args()
+    benchmark(args.rows, args.repeat)
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import tempfile
+
+from container import ApplicationContainer
+from infrastructure.database.migrations import migrate
+from infrastructure.database.query_plans import (
+    SAMPLE_DATA_SQL, TracingDatabaseConnection, check_query_plans
+)
+
+
+def check_plans(verbose: bool) -> bool:
+    # Планы строятся на отдельной временной базе со схемой приложения — рабочая база не меняется
+    with tempfile.TemporaryDirectory() as directory:
+        db = TracingDatabaseConnection(os.path.join(directory, 'plans.db'), pool_size=1)
+        migrate(db)
+        with db.get_connection() as conn:
+            conn.executescript(SAMPLE_DATA_SQL)
+
+        container = ApplicationContainer()
+        container.db_connection = db
+        container._init_repositories()
+
+        try:
+            results = check_query_plans(db, container.repositories)
+        finally:
+            db.close_all()
+
+    failed = [result for result in results if result.problems]
+    for result in results:
+        if not (verbose or result.problems):
+            continue
+        mark = '❌' if result.problems else '✅'
+        print(f"{mark} {result.check.name}")
+        print(f"   {' '.join(result.statement.split())}")
+        for detail in result.plan:
+            print(f"   → {detail}")
+        if result.check.allow and not result.problems and verbose:
+            print(f"   допущено: {result.check.reason}")
+
+    checks = {result.check.name for result in results}
+    print(f"Проверено запросов: {len(results)} ({len(checks)} вызовов), с полным сканированием "
+          f"или временной сортировкой: {len(failed)}")
+    return not failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Проверка планов запросов репозиториев: полные сканирования и сортировки во временных B-деревьях'
+    )
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Показать планы всех запросов, а не только проблемных')
+    args = parser.parse_args()
+    sys.exit(0 if check_plans(args.verbose) else 1)
@@ -0,0 +1,138 @@
+# Infrastructure
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.database.migrations import MIGRATION_BATCH_SIZE, migrate
+from infrastructure.database.profiles import get_profile
+from infrastructure.cache.identity_cache import IdentityCache
+from infrastructure.cache.reference_cache import ReferenceDataCache
+
+# Repositories
+from infrastructure.repositories.user_repository import UserRepository
+from infrastructure.repositories.student_repository import StudentRepository
+from infrastructure.repositories.subject_repository import SubjectRepository
+from infrastructure.repositories.grade_repository import GradeRepository
+from infrastructure.repositories.attendance_repository import AttendanceRepository
+from infrastructure.repositories.schedule_repository import ScheduleRepository
+from infrastructure.repositories.parent_child_repository import ParentChildRepository
+from infrastructure.repositories.stats_repository import StatsRepository
+from infrastructure.repositories.report_repository import ReportRepository
+from infrastructure.repositories.risk_repository import RiskRepository
+from infrastructure.repositories.cached_reference_repository import (
+    CachedSubjectRepository, CachedScheduleRepository
+)
+from infrastructure.security.password_hasher import PasswordHasher
+from infrastructure.security.password_verifier import PasswordVerifier
+from infrastructure.security.rate_limiter import TokenBucketLimiter
+
+# Application Services
+from application.services.auth_service import AuthService
+from application.services.student_service import StudentService
+from application.services.provisioning_service import ProvisioningService
+from application.services.report_service import ReportService
+from application.services.risk_service import RiskService
+
+
+class ApplicationContainer:
+    # База, репозитории и сервисы без Flask: CLI-задачи (init_data.py, score_risk.py, ...)
+    # собирают только их и не платят за импорт веб-слоя
+    
+    def __init__(self):
+        self.app = None
+        self.db_connection = None
+        self.identity_cache = None
+        self.reference_cache = None
+        self.repositories = {}
+        self.services = {}
+    
+    def _init_database(self):
+        # CLI-задачи вызывают этот метод без create_app, поэтому конфигурация может отсутствовать
+        config = self.app.config if self.app else {}
+        self.db_connection = DatabaseConnection(
+            pool_size=config.get('DATABASE_POOL_SIZE', 8),
+            cached_statements=config.get('DATABASE_CACHED_STATEMENTS', 256),
+            profile=get_profile(config.get('DATABASE_PROFILE', 'performance'))
+        )
+        
+        # Схема обновляется миграциями; при актуальной версии это чтение PRAGMA user_version и sqlite_master
+        migrate(self.db_connection, batch_size=config.get('DATABASE_MIGRATION_BATCH', MIGRATION_BATCH_SIZE))
+    
+    def _init_repositories(self):
+        config = self.app.config if self.app else {}
+        # Пользователь с профилем ученика нужен на каждом запросе — держим его в памяти процесса
+        self.identity_cache = IdentityCache(
+            max_size=config.get('IDENTITY_CACHE_SIZE', 10000),
+            ttl=config.get('IDENTITY_CACHE_TTL', 60)
+        )
+        # Предметы и расписание меняются несколько раз в год
+        self.reference_cache = ReferenceDataCache(ttl=config.get('REFERENCE_CACHE_TTL', 300))
+        self.repositories = {
+            'user': UserRepository(self.db_connection, self.identity_cache),
+            'student': StudentRepository(self.db_connection, self.identity_cache),
+            'subject': CachedSubjectRepository(
+                SubjectRepository(self.db_connection), self.db_connection, self.reference_cache
+            ),
+            'grade': GradeRepository(self.db_connection),
+            'attendance': AttendanceRepository(self.db_connection),
+            'schedule': CachedScheduleRepository(
+                ScheduleRepository(self.db_connection), self.db_connection, self.reference_cache
+            ),
+            'parent_child': ParentChildRepository(self.db_connection),
+            'stats': StatsRepository(self.db_connection),
+            'report': ReportRepository(self.db_connection),
+            'risk': RiskRepository(self.db_connection),
+        }
+    
+    def _init_services(self):
+        config = self.app.config if self.app else {}
+        password_hasher = PasswordHasher(
+            workers=config.get('PASSWORD_HASH_WORKERS'),
+            method=config.get('PASSWORD_HASH_METHOD', 'pbkdf2')
+        )
+        
+        self.services = {
+            'auth': AuthService(
+                self.repositories['user'],
+                self.repositories['student'],
+                password_verifier=PasswordVerifier(
+                    password_hasher,
+                    workers=config.get('LOGIN_VERIFY_WORKERS', 4),
+                    max_pending=config.get('LOGIN_VERIFY_QUEUE', 32)
+                ),
+                # Логин: небольшой запас попыток, далее одна попытка в 10 секунд; IP: до 1 в секунду
+                user_limiter=TokenBucketLimiter(config.get('LOGIN_USER_BURST', 5), 0.1),
+                ip_limiter=TokenBucketLimiter(config.get('LOGIN_IP_BURST', 30), 1.0)
+            ),
+        }
+        
+        # Student service зависит от auth service
+        self.services['student'] = StudentService(
+            self.repositories['student'],
+            self.repositories['grade'],
+            self.repositories['attendance'],
+            self.repositories['schedule'],
+            self.repositories['subject'],
+            self.repositories['stats'],
+            self.services['auth']
+        )
+        
+        self.services['report'] = ReportService(
+            self.repositories['report'],
+            self.repositories['subject'],
+            self.services['auth']
+        )
+        
+        # Оценка риска неуспеваемости; дочерние процессы открывают базу по пути
+        self.services['risk'] = RiskService(
+            self.repositories['risk'],
+            self.services['auth'],
+            self.db_connection.db_path
+        )
+        
+        # Массовое создание пользователей с хешированием паролей в пуле процессов
+        self.services['provisioning'] = ProvisioningService(
+            self.repositories['user'],
+            self.repositories['student'],
+            self.repositories['parent_child'],
+            password_hasher,
+            self.db_connection
+        )
+    
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from datetime import date
+from domain.entities.subject import Subject
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Attendance:
     id: int | None
     student_id: int
@@ -11,6 +12,7 @@ class Attendance:
     date: date
     present: bool
     reason: str | None = None
+    subject: Subject | None = None  # заполняется сервисом для отображения
     
     def __repr__(self):
         return f'<Attendance {self.present} for student {self.student_id}>'
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from datetime import date
+from domain.entities.subject import Subject
 
 
+GRADE_VALUES = (2, 3, 4, 5)
 
-@dataclass
+
+@dataclass(slots=True)
 class Grade:
     id: int | None
     student_id: int
@@ -11,6 +14,7 @@ class Grade:
     grade: int
     date: date
     comment: str | None = None
+    subject: Subject | None = None  # заполняется сервисом для отображения
     
     def __repr__(self):
         return f'<Grade {self.grade} for student {self.student_id}>'
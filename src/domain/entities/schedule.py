@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from datetime import time
+from domain.entities.subject import Subject
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Schedule:
     id: int | None
     subject_id: int
@@ -11,6 +12,7 @@ class Schedule:
     time_start: time
     time_end: time
     classroom: str | None = None
+    subject: Subject | None = None  # заполняется сервисом для отображения
     
     def __repr__(self):
         return f'<Schedule subject {self.subject_id} on day {self.day_of_week}>'
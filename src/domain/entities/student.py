@@ -3,7 +3,7 @@ from datetime import datetime
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Student:
     id: int | None
     name: str
@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from domain.entities.student import Student
+
+
+
+@dataclass(slots=True)
+class StudentRisk:
+    student_id: int
+    score: float
+    average: float | None = None
+    trend: float | None = None  # изменение оценки в месяц
+    absence_rate: float | None = None
+    absence_streak: int = 0
+    reasons: list[str] = field(default_factory=list)
+    computed_at: datetime | None = None
+    student: Student | None = None
+    
+    def __repr__(self):
+        return f'<StudentRisk {self.score:.0f} for student {self.student_id}>'
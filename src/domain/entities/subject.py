@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Subject:
     id: int | None
     name: str
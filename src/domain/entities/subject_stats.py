@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from datetime import date
+
+
+
+@dataclass(slots=True)
+class SubjectStats:
+    student_id: int
+    subject_id: int
+    grade_sum: int = 0
+    grade_count: int = 0
+    last_grade_date: date | None = None
+    present_count: int = 0
+    absent_count: int = 0
+    last_attendance_date: date | None = None
+    
+    @property
+    def average(self) -> float | None:
+        return self.grade_sum / self.grade_count if self.grade_count else None
+    
+    @property
+    def attendance_rate(self) -> float | None:
+        total = self.present_count + self.absent_count
+        return self.present_count / total if total else None
+    
+    def __repr__(self):
+        return f'<SubjectStats student {self.student_id} subject {self.subject_id}>'
+
+
+@dataclass(slots=True)
+class StudentStats:
+    # Итог по ученику по всем предметам
+    student_id: int
+    grade_sum: int = 0
+    grade_count: int = 0
+    present_count: int = 0
+    absent_count: int = 0
+    
+    @property
+    def average(self) -> float | None:
+        return self.grade_sum / self.grade_count if self.grade_count else None
+    
+    @property
+    def attendance_rate(self) -> float | None:
+        total = self.present_count + self.absent_count
+        return self.present_count / total if total else None
+    
+    def __repr__(self):
+        return f'<StudentStats student {self.student_id}>'
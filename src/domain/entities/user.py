@@ -4,9 +4,6 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
-from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-
 
 class UserRole(Enum):
     STUDENT = "student"
@@ -15,8 +12,8 @@ class UserRole(Enum):
     ADMIN = "admin"
 
 
-@dataclass
-class User(UserMixin):
+@dataclass(slots=True)
+class User:
     id: int | None
     username: str
     email: str
@@ -43,17 +40,32 @@ class User(UserMixin):
     def is_admin(self) -> bool:
         return self.role == UserRole.ADMIN
     
+    # Интерфейс пользователя Flask-Login без зависимости доменного слоя от Flask
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+    
+    @property
+    def is_anonymous(self) -> bool:
+        return False
+    
+    def get_id(self) -> str:
+        return str(self.id)
+    
     def set_password(self, password: str):
+        # werkzeug импортируется при первом обращении: скриптам без хеширования он не нужен
+        from werkzeug.security import generate_password_hash
         self.password_hash = generate_password_hash(password)
     
     def check_password(self, password: str) -> bool:
+        from werkzeug.security import check_password_hash
         return check_password_hash(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username} ({self.role.value})>'
 
 
-@dataclass
+@dataclass(slots=True)
 class ParentChild:
     id: int | None
     parent_id: int
@@ -65,7 +77,7 @@ class ParentChild:
         return f'<ParentChild {self.parent_id} -> {self.child_id}>'
 
 
-@dataclass
+@dataclass(slots=True)
 class TeacherSubject:
     id: int | None
     teacher_id: int
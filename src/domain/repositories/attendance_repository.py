@@ -8,8 +8,20 @@ class IAttendanceRepository(BaseRepository[Attendance]):
     def get_by_student(self, student_id: int) -> list[Attendance]:
         raise NotImplementedError
     
+    def get_page_by_student(self, student_id: int, limit: int,
+                            before: tuple[date, int] | None = None,
+                            date_from: date | None = None,
+                            date_to: date | None = None) -> list[Attendance]:
+        raise NotImplementedError
+    
     def get_by_student_and_subject(self, student_id: int, subject_id: int) -> list[Attendance]:
         raise NotImplementedError
     
     def get_by_date_range(self, start_date: date, end_date: date) -> list[Attendance]:
         raise NotImplementedError
+    
+    def get_by_lesson(self, subject_id: int, lesson_date: date) -> list[Attendance]:
+        raise NotImplementedError
+    
+    def create_many(self, records: list[Attendance]) -> int:
+        raise NotImplementedError
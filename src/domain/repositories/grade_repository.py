@@ -1,4 +1,5 @@
 from datetime import date
+from typing import Iterable, Iterator
 from domain.entities.grade import Grade
 from domain.repositories.base_repository import BaseRepository
 
@@ -8,8 +9,21 @@ class IGradeRepository(BaseRepository[Grade]):
     def get_by_student(self, student_id: int) -> list[Grade]:
         raise NotImplementedError
     
+    def get_page_by_student(self, student_id: int, limit: int,
+                            before: tuple[date, int] | None = None,
+                            date_from: date | None = None,
+                            date_to: date | None = None) -> list[Grade]:
+        raise NotImplementedError
+    
+    def iter_statistics_rows(self, student_ids: Iterable[int] | None = None,
+                             subject_id: int | None = None) -> Iterator[tuple[int, int, int, int]]:
+        raise NotImplementedError
+    
     def get_by_student_and_subject(self, student_id: int, subject_id: int) -> list[Grade]:
         raise NotImplementedError
     
     def get_by_date_range(self, start_date: date, end_date: date) -> list[Grade]:
         raise NotImplementedError
+    
+    def create_many(self, grades: list[Grade]) -> int:
+        raise NotImplementedError
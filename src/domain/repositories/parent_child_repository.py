@@ -0,0 +1,14 @@
+from domain.entities.user import ParentChild
+from domain.repositories.base_repository import BaseRepository
+
+
+class IParentChildRepository(BaseRepository[ParentChild]):
+    
+    def get_by_parent(self, parent_id: int) -> list[ParentChild]:
+        raise NotImplementedError
+    
+    def get_by_child(self, child_id: int) -> list[ParentChild]:
+        raise NotImplementedError
+    
+    def create_many(self, links: list[ParentChild]) -> int:
+        raise NotImplementedError
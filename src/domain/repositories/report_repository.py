@@ -0,0 +1,14 @@
+from datetime import date
+from typing import Iterable, Iterator
+
+
+class IReportRepository:
+    
+    def iter_subject_journal(self, student_ids: Iterable[int], subject_id: int | None = None) -> Iterator[dict]:
+        raise NotImplementedError
+    
+    def get_subject_days(self, subject_id: int, student_ids: Iterable[int]) -> list[tuple[int, date, int | None, bool | None]]:
+        raise NotImplementedError
+    
+    def get_subject_totals(self, subject_id: int, student_ids: Iterable[int]) -> dict[int, tuple[int, int, int, int]]:
+        raise NotImplementedError
@@ -0,0 +1,18 @@
+from datetime import date
+from typing import Iterator
+from domain.entities.student_risk import StudentRisk
+
+
+class IRiskRepository:
+    
+    def iter_grades(self, since: date, partition: tuple[int, int] | None = None) -> Iterator[tuple[int, date, int]]:
+        raise NotImplementedError
+    
+    def iter_attendance(self, since: date, partition: tuple[int, int] | None = None) -> Iterator[tuple[int, date, bool]]:
+        raise NotImplementedError
+    
+    def replace_all(self, risks: list[StudentRisk]) -> int:
+        raise NotImplementedError
+    
+    def get_top(self, limit: int | None = None) -> list[StudentRisk]:
+        raise NotImplementedError
@@ -0,0 +1,25 @@
+from domain.entities.subject_stats import SubjectStats, StudentStats
+
+
+class IStatsRepository:
+    
+    def get(self, student_id: int, subject_id: int) -> SubjectStats | None:
+        raise NotImplementedError
+    
+    def get_by_student(self, student_id: int) -> list[SubjectStats]:
+        raise NotImplementedError
+    
+    def get_by_students(self, student_ids: list[int]) -> dict[int, StudentStats]:
+        raise NotImplementedError
+    
+    def get_class_cells(self, class_name: str, recent: int) -> list[tuple[int, int, int, int, int | None, int | None]]:
+        raise NotImplementedError
+    
+    def get_class_version(self, class_name: str) -> tuple[int, int, int]:
+        raise NotImplementedError
+    
+    def get_students_version(self, student_ids: list[int]) -> int:
+        raise NotImplementedError
+    
+    def rebuild(self) -> int:
+        raise NotImplementedError
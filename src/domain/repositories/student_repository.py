@@ -9,3 +9,27 @@ class IStudentRepository(BaseRepository[Student]):
     
     def get_by_user_id(self, user_id: int) -> Student | None:
         raise NotImplementedError
+    
+    def get_by_parent(self, parent_id: int) -> list[Student]:
+        raise NotImplementedError
+    
+    def get_by_teacher(self, teacher_id: int) -> list[Student]:
+        raise NotImplementedError
+    
+    def get_teacher_class_names(self, teacher_id: int) -> list[str]:
+        raise NotImplementedError
+    
+    def is_owned_by_user(self, student_id: int, user_id: int) -> bool:
+        raise NotImplementedError
+    
+    def has_parent(self, student_id: int, parent_id: int) -> bool:
+        raise NotImplementedError
+    
+    def is_in_teacher_classes(self, student_id: int, teacher_id: int) -> bool:
+        raise NotImplementedError
+    
+    def get_class_names(self) -> list[str]:
+        raise NotImplementedError
+    
+    def create_many(self, students: list[Student]) -> list[Student]:
+        raise NotImplementedError
@@ -6,3 +6,6 @@ class ISubjectRepository(BaseRepository[Subject]):
     
     def get_by_name(self, name: str) -> Subject | None:
         raise NotImplementedError
+    
+    def get_all_by_id(self) -> dict[int, Subject]:
+        raise NotImplementedError
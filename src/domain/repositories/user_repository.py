@@ -12,3 +12,6 @@ class IUserRepository(BaseRepository[User]):
     
     def get_by_role(self, role: UserRole) -> list[User]:
         raise NotImplementedError
+    
+    def create_many(self, users: list[User]) -> list[User]:
+        raise NotImplementedError
@@ -0,0 +1,34 @@
+from dataclasses import replace
+
+from domain.entities.user import User
+from infrastructure.cache.ttl_cache import TTLCache
+
+
+class IdentityCache:
+    # Пользователь вместе с профилем ученика для user_loader. Сброс при изменении
+    # происходит только в текущем процессе, поэтому TTL ограничивает устаревание в остальных воркерах.
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self._cache = TTLCache(max_size, ttl)
+
+    def get(self, user_id: int) -> User | None:
+        user = self._cache.get(user_id)
+        # Отдаём копию: обработчики запросов могут менять поля current_user
+        return self._copy(user) if user else None
+
+    def put(self, user: User):
+        self._cache.set(user.id, self._copy(user))
+
+    def invalidate(self, user_id: int | None):
+        if user_id is not None:
+            self._cache.invalidate(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self) -> dict:
+        return self._cache.get_stats()
+
+    def _copy(self, user: User) -> User:
+        student_profile = replace(user.student_profile) if user.student_profile else None
+        return replace(user, student_profile=student_profile)
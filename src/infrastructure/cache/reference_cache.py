@@ -0,0 +1,44 @@
+import threading
+import time
+
+from typing import Any, Callable
+
+
+class ReferenceDataCache:
+    # Справочники (предметы, расписание) меняются редко, а читаются на каждой странице.
+    # Любое изменение увеличивает версию и сбрасывает все записи; TTL ограничивает
+    # устаревание, если данные правит другой процесс.
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.version = 0
+        self._entries: dict[str, tuple[int, float, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self.version and entry[1] > now:
+                self._stats['hits'] += 1
+                return entry[2]
+            self._stats['misses'] += 1
+            version = self.version
+
+        value = loader()
+        with self._lock:
+            # Если пока шла загрузка данные изменились, результат уже устарел — не сохраняем его
+            if version == self.version:
+                self._entries[key] = (version, now + self.ttl, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'version': self.version, 'entries': len(self._entries), 'ttl': self.ttl, **self._stats}
@@ -0,0 +1,379 @@
+import csv
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+from datetime import date, datetime, time as dt_time
+from typing import Callable, Iterable, Iterator
+
+from domain.entities.user import User, UserRole
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.database.migrations import (
+    BULK_LOAD_CLAIM, BULK_LOAD_RESTORE_SQL, CLAIMS_SQL, finish_bulk_load
+)
+from infrastructure.security.password_hasher import PasswordHasher
+
+
+# Порядок загрузки: записи ссылаются на ранее загруженные по имени
+SECTION_ORDER = (
+    'users', 'students', 'subjects', 'schedule', 'grades', 'attendance',
+    'parent_child', 'teacher_subject', 'teacher_class', 'student_user',
+)
+RELATIONSHIP_SECTIONS = ('parent_child', 'teacher_subject', 'teacher_class', 'student_user')
+
+# Таблицы, индексы которых при загрузке в пустую базу снимаются и строятся заново после неё
+BULK_TABLES = ('grades', 'attendance')
+
+Record = tuple[str, dict]
+
+
+def read_json(path: str) -> Iterator[Record]:
+    # Формат seed.json: разделы-массивы и вложенный раздел relationships
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    relationships = data.get('relationships', {})
+    for section in SECTION_ORDER:
+        source = relationships if section in RELATIONSHIP_SECTIONS else data
+        for record in source.get(section, []):
+            yield section, record
+
+
+def read_jsonl(path: str) -> Iterator[Record]:
+    # Одна запись на строку: {"section": "grades", "student_name": ..., ...}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield record.pop('section'), record
+
+
+def read_csv(path: str) -> Iterator[Record]:
+    # Один CSV на раздел: grades.csv, attendance.csv, ... либо каталог с такими файлами
+    if os.path.isdir(path):
+        for section in SECTION_ORDER:
+            section_path = os.path.join(path, f'{section}.csv')
+            if os.path.exists(section_path):
+                yield from read_csv(section_path)
+        return
+
+    section = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield section, row
+
+
+def read_records(path: str) -> Iterator[Record]:
+    if os.path.isdir(path) or path.endswith('.csv'):
+        return read_csv(path)
+    if path.endswith('.jsonl'):
+        return read_jsonl(path)
+    return read_json(path)
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'да')
+    return bool(value)
+
+
+class BulkImporter:
+
+    def __init__(self, db_connection: DatabaseConnection, batch_size: int = 50000,
+                 progress_every: int = 100000, report: Callable[[str], None] = print,
+                 password_hasher: PasswordHasher | None = None):
+        self.db = db_connection
+        self._owns_hasher = password_hasher is None
+        self.password_hasher = password_hasher or PasswordHasher()
+        self.batch_size = batch_size
+        self.progress_every = progress_every
+        self.report = report
+        self.counts = {section: 0 for section in SECTION_ORDER}
+        self.skipped = 0
+        self._users: dict[str, int] = {}
+        self._students: dict[str, int] = {}
+        self._subjects: dict[str, int] = {}
+        self._buffers: dict[str, list[tuple]] = {'grades': [], 'attendance': []}
+        self._pending_users: list[tuple[User, str | None]] = []
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._deferred = False
+        self._handlers = {
+            'users': self._add_user,
+            'students': self._add_student,
+            'subjects': self._add_subject,
+            'schedule': self._add_schedule,
+            'grades': self._add_grade,
+            'attendance': self._add_attendance,
+            'parent_child': self._add_parent_child,
+            'teacher_subject': self._add_teacher_subject,
+            'teacher_class': self._add_teacher_class,
+            'student_user': self._add_student_user,
+        }
+
+    def import_file(self, path: str) -> dict[str, int]:
+        return self.import_records(read_records(path))
+
+    def import_records(self, records: Iterable[Record]) -> dict[str, int]:
+        started = time.perf_counter()
+        with self.db.get_connection() as conn:
+            self.db.acquire_write_lock()
+            synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+            try:
+                # Индексы снимаются только при первичной загрузке в пустые таблицы: рабочую базу
+                # читают другие процессы, и ей хватает пакетных транзакций
+                if self._is_fresh(conn):
+                    # Пустую базу после сбоя питания проще загрузить заново — жертвуем устойчивостью ради скорости
+                    conn.execute("PRAGMA synchronous = OFF")
+                    self._drop_indexes(conn)
+                self._load_lookups(conn)
+                self._load(conn, records, started)
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                # Индексы строятся уже с обычной синхронизацией
+                conn.execute(f"PRAGMA synchronous = {int(synchronous)}")
+                self._restore_indexes(conn)
+                self.db.release_write_lock()
+                if self._owns_hasher:
+                    self.password_hasher.close()
+
+        total = sum(self.counts.values())
+        elapsed = time.perf_counter() - started
+        self.report(f"Импорт завершён: {total} строк за {elapsed:.1f} с "
+                    f"({total / elapsed if elapsed else 0:.0f} строк/с), пропущено: {self.skipped}")
+        return dict(self.counts)
+
+    def _load(self, conn: sqlite3.Connection, records: Iterable[Record], started: float):
+        pending = 0
+        loaded = 0
+        conn.execute("BEGIN")
+        for section, record in records:
+            # Следующие разделы ссылаются на пользователей по логину, поэтому пачка
+            # пользователей записывается до перехода к ним
+            if section != 'users' and self._pending_users:
+                self._flush_users(conn)
+            handler = self._handlers.get(section)
+            if handler is None or not handler(conn, record):
+                self.skipped += 1
+                continue
+            self.counts[section] += 1
+            pending += 1
+            loaded += 1
+            if pending >= self.batch_size:
+                self._flush(conn)
+                self._renew_claim(conn)
+                conn.commit()
+                conn.execute("BEGIN")
+                pending = 0
+            if loaded % self.progress_every == 0:
+                elapsed = time.perf_counter() - started
+                self.report(f"Загружено {loaded} строк ({loaded / elapsed:.0f} строк/с)")
+        self._flush(conn)
+        self._renew_claim(conn)
+        conn.commit()
+
+    def _flush(self, conn: sqlite3.Connection):
+        if self._pending_users:
+            self._flush_users(conn)
+        if self._buffers['grades']:
+            conn.executemany(
+                "INSERT INTO grades (student_id, subject_id, grade, date, comment) VALUES (?, ?, ?, ?, ?)",
+                self._buffers['grades']
+            )
+            self._buffers['grades'] = []
+        if self._buffers['attendance']:
+            conn.executemany(
+                "INSERT INTO attendance (student_id, subject_id, date, present, reason) VALUES (?, ?, ?, ?, ?)",
+                self._buffers['attendance']
+            )
+            self._buffers['attendance'] = []
+
+    def _is_fresh(self, conn: sqlite3.Connection) -> bool:
+        return not any(
+            conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() for table in BULK_TABLES
+        )
+
+    def _drop_indexes(self, conn: sqlite3.Connection):
+        # Вместе с индексами снимаются триггеры агрегатов: пересчитать их один раз
+        # после загрузки дешевле, чем обновлять построчно. В той же транзакции DDL сохраняется
+        # в bulk_load_restore и ставится захват: если процесс убьют, их вернёт migrate() при старте
+        placeholders = ', '.join('?' for _ in BULK_TABLES)
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            f"SELECT type, name, sql FROM sqlite_master "
+            f"WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+            BULK_TABLES
+        ).fetchall()
+        conn.execute(BULK_LOAD_RESTORE_SQL)
+        conn.execute(CLAIMS_SQL)
+        conn.executemany(
+            "INSERT OR REPLACE INTO bulk_load_restore (name, type, sql) VALUES (?, ?, ?)",
+            [(row['name'], row['type'], row['sql']) for row in rows]
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO migration_claims (version, owner, renewed_at) VALUES (?, ?, ?)",
+            (BULK_LOAD_CLAIM, self._owner, time.time())
+        )
+        for row in rows:
+            conn.execute(f'DROP {row["type"].upper()} IF EXISTS "{row["name"]}"')
+        conn.commit()
+        self._deferred = True
+
+    def _renew_claim(self, conn: sqlite3.Connection):
+        # Продление в транзакции пачки: потерянный захват значит, что индексы уже вернул другой процесс
+        if not self._deferred:
+            return
+        renewed = conn.execute(
+            "UPDATE migration_claims SET renewed_at = ? WHERE version = ? AND owner = ?",
+            (time.time(), BULK_LOAD_CLAIM, self._owner)
+        ).rowcount
+        if not renewed:
+            self._deferred = False
+            raise sqlite3.OperationalError("Индексы загрузки восстановлены другим процессом")
+
+    def _restore_indexes(self, conn: sqlite3.Connection):
+        if not self._deferred:
+            return
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._renew_claim(conn)
+            finish_bulk_load(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        self._deferred = False
+        self.report(f"Индексы и агрегаты перестроены за {time.perf_counter() - started:.1f} с")
+
+    def _load_lookups(self, conn: sqlite3.Connection):
+        self._users = {row['username']: row['id'] for row in conn.execute("SELECT id, username FROM users")}
+        self._students = {row['name']: row['id'] for row in conn.execute("SELECT id, name FROM students")}
+        self._subjects = {row['name']: row['id'] for row in conn.execute("SELECT id, name FROM subjects")}
+
+    def _flush_users(self, conn: sqlite3.Connection):
+        pending, self._pending_users = self._pending_users, []
+        # Пароли пачки хешируются параллельно в пуле процессов
+        to_hash = [(user, password) for user, password in pending if not user.password_hash]
+        hashes = self.password_hasher.hash_many([password for _, password in to_hash])
+        for (user, _), password_hash in zip(to_hash, hashes):
+            user.password_hash = password_hash
+        now = datetime.utcnow()
+        for user, _ in pending:
+            cursor = conn.execute(
+                "INSERT INTO users (username, email, password_hash, role, first_name, last_name, is_active, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user.username, user.email, user.password_hash, user.role.value,
+                 user.first_name, user.last_name, True, now)
+            )
+            self._users[user.username] = cursor.lastrowid
+
+    def _add_user(self, conn: sqlite3.Connection, record: dict) -> bool:
+        user = User(
+            id=None,
+            username=record['username'],
+            email=record['email'],
+            password_hash=record.get('password_hash', ''),
+            role=UserRole(record['role']),
+            first_name=record['first_name'],
+            last_name=record['last_name']
+        )
+        self._pending_users.append((user, None if user.password_hash else record['password']))
+        return True
+
+    def _add_student(self, conn: sqlite3.Connection, record: dict) -> bool:
+        cursor = conn.execute(
+            "INSERT INTO students (name, class_name, user_id, created_at) VALUES (?, ?, ?, ?)",
+            (record['name'], record['class_name'], None, datetime.utcnow())
+        )
+        self._students[record['name']] = cursor.lastrowid
+        return True
+
+    def _add_subject(self, conn: sqlite3.Connection, record: dict) -> bool:
+        cursor = conn.execute(
+            "INSERT INTO subjects (name, teacher) VALUES (?, ?)",
+            (record['name'], record['teacher'])
+        )
+        self._subjects[record['name']] = cursor.lastrowid
+        return True
+
+    def _add_schedule(self, conn: sqlite3.Connection, record: dict) -> bool:
+        subject_id = self._subjects.get(record['subject_name'])
+        if subject_id is None:
+            return False
+        conn.execute(
+            "INSERT INTO schedule (subject_id, day_of_week, time_start, time_end, classroom) VALUES (?, ?, ?, ?, ?)",
+            (subject_id, int(record['day_of_week']),
+             dt_time.fromisoformat(record['time_start']).strftime('%H:%M'),
+             dt_time.fromisoformat(record['time_end']).strftime('%H:%M'),
+             record.get('classroom'))
+        )
+        return True
+
+    def _add_grade(self, conn: sqlite3.Connection, record: dict) -> bool:
+        student_id = self._students.get(record['student_name'])
+        subject_id = self._subjects.get(record['subject_name'])
+        if student_id is None or subject_id is None:
+            return False
+        self._buffers['grades'].append((
+            student_id, subject_id, int(record['grade']),
+            date.fromisoformat(record['date']).isoformat(), record.get('comment', '')
+        ))
+        return True
+
+    def _add_attendance(self, conn: sqlite3.Connection, record: dict) -> bool:
+        student_id = self._students.get(record['student_name'])
+        subject_id = self._subjects.get(record['subject_name'])
+        if student_id is None or subject_id is None:
+            return False
+        self._buffers['attendance'].append((
+            student_id, subject_id, date.fromisoformat(record['date']).isoformat(),
+            _to_bool(record['present']), record.get('reason', '')
+        ))
+        return True
+
+    def _add_parent_child(self, conn: sqlite3.Connection, record: dict) -> bool:
+        parent_id = self._users.get(record['parent_username'])
+        child_id = self._students.get(record['child_name'])
+        if parent_id is None or child_id is None:
+            return False
+        conn.execute(
+            "INSERT INTO parent_child (parent_id, child_id, relationship) VALUES (?, ?, ?)",
+            (parent_id, child_id, record.get('relationship', 'parent'))
+        )
+        return True
+
+    def _add_teacher_subject(self, conn: sqlite3.Connection, record: dict) -> bool:
+        teacher_id = self._users.get(record['teacher_username'])
+        subject_id = self._subjects.get(record['subject_name'])
+        if teacher_id is None or subject_id is None:
+            return False
+        conn.execute(
+            "INSERT INTO teacher_subject (teacher_id, subject_id, is_primary) VALUES (?, ?, ?)",
+            (teacher_id, subject_id, _to_bool(record.get('is_primary', True)))
+        )
+        return True
+
+    def _add_teacher_class(self, conn: sqlite3.Connection, record: dict) -> bool:
+        teacher_id = self._users.get(record['teacher_username'])
+        if teacher_id is None or not record.get('class_name'):
+            return False
+        conn.execute(
+            "INSERT OR IGNORE INTO teacher_class (teacher_id, class_name) VALUES (?, ?)",
+            (teacher_id, record['class_name'])
+        )
+        return True
+
+    def _add_student_user(self, conn: sqlite3.Connection, record: dict) -> bool:
+        student_id = self._students.get(record['student_name'])
+        user_id = self._users.get(record['user_username'])
+        if student_id is None or user_id is None:
+            return False
+        conn.execute("UPDATE students SET user_id = ? WHERE id = ?", (user_id, student_id))
+        return True
@@ -1,47 +1,294 @@
 import sqlite3
 import os
+import threading
+import time
 
 from contextlib import contextmanager
+from contextvars import ContextVar
 
+from infrastructure.database.converters import register_converters
+from infrastructure.database.profiles import DatabaseProfile, PROFILES
+from infrastructure.database.unit_of_work import UnitOfWork
+from infrastructure.database.write_queue import WriteQueue, retry_on_busy
+
+register_converters()
 
 class DatabaseConnection:
-    
-    def __init__(self, db_path: str = "instance/diary.db"):
+
+    def __init__(self, db_path: str = "instance/diary.db", pool_size: int = 8,
+                 cached_statements: int = 256, health_check_interval: float = 30.0,
+                 pool_timeout: float = 10.0, profile: DatabaseProfile | None = None,
+                 write_batch_size: int = 100, max_retries: int = 5, retry_delay: float = 0.05):
         self.db_path = db_path
+        self.profile = profile or PROFILES['performance']
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.pool_size = pool_size
+        self.cached_statements = cached_statements
+        self.health_check_interval = health_check_interval
+        self.pool_timeout = pool_timeout
         self._ensure_db_directory()
-    
+
+        # Пул долгоживущих соединений: свободные соединения хранятся стеком (LIFO),
+        # чтобы чаще переиспользовать «прогретые» соединения с заполненным кэшем запросов
+        self._idle: list[tuple[sqlite3.Connection, float]] = []
+        self._open_count = 0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._current_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar(
+            f'unit_of_work_{id(self)}', default=None
+        )
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'waits': 0,
+            'health_check_failures': 0,
+            'discarded': 0,
+        }
+
+        # Все записи процесса проходят через один замок: писатели ждут своей очереди здесь,
+        # а не крутятся на SQLITE_BUSY внутри SQLite
+        self._write_lock = threading.Lock()
+        self._write_queue = WriteQueue(self._create_connection, self._write_lock,
+                                       batch_size=write_batch_size, max_retries=max_retries,
+                                       retry_delay=retry_delay)
+
     def _ensure_db_directory(self):
         db_dir = os.path.dirname(self.db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
-    
+
+    def _create_connection(self) -> sqlite3.Connection:
+        # check_same_thread=False: соединение переходит между потоками через пул,
+        # но в каждый момент времени используется только одним потоком
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=self.cached_statements,
+                               detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row  # Для доступа к колонкам по имени
+        for pragma in self.profile.pragmas():
+            conn.execute(pragma)
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _acquire(self) -> sqlite3.Connection:
+        # Вложенные вызовы в одном потоке используют уже выданное соединение
+        if getattr(self._local, 'depth', 0) > 0:
+            self._local.depth += 1
+            return self._local.conn
+
+        conn, last_used = None, 0.0
+        deadline = time.monotonic() + self.pool_timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._open_count < self.pool_size:
+                    self._open_count += 1
+                    break
+                self._stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise sqlite3.OperationalError("Пул соединений исчерпан")
+
+        try:
+            if conn is not None:
+                if (time.monotonic() - last_used > self.health_check_interval
+                        and not self._is_healthy(conn)):
+                    self._stats['health_check_failures'] += 1
+                    self._close_quietly(conn)
+                    conn = None
+                else:
+                    self._stats['reused'] += 1
+            if conn is None:
+                conn = self._create_connection()
+                self._stats['created'] += 1
+        except Exception:
+            with self._condition:
+                self._open_count -= 1
+                self._condition.notify()
+            raise
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection, discard: bool = False):
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        with self._condition:
+            if discard:
+                self._open_count -= 1
+                self._stats['discarded'] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+        if discard:
+            self._close_quietly(conn)
+
+    def _close_quietly(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire_write_lock(self):
+        if not self._write_lock.acquire(timeout=self.profile.busy_timeout / 1000):
+            raise sqlite3.OperationalError("database is locked")
+
+    def release_write_lock(self):
+        self._write_lock.release()
+
+    def retry_on_busy(self, operation):
+        return retry_on_busy(operation, self.max_retries, self.retry_delay)
+
+    def unit_of_work(self, read_only: bool = False) -> UnitOfWork:
+        return UnitOfWork(self, read_only)
+
+    def begin_unit_of_work(self, read_only: bool = False) -> UnitOfWork:
+        return self.unit_of_work(read_only).begin()
+
+    def in_unit_of_work(self) -> bool:
+        return self._current_unit_of_work.get() is not None
+
+    def after_commit(self, callback):
+        # Внутри единицы работы откладываем до фиксации её транзакции, иначе запись уже зафиксирована
+        unit_of_work = self._current_unit_of_work.get()
+        if unit_of_work is not None:
+            unit_of_work.on_commit(callback)
+        else:
+            callback()
+
     @contextmanager
     def get_connection(self):
-        conn = None
+        unit_of_work = self._current_unit_of_work.get()
+        if unit_of_work is not None:
+            # Внутри единицы работы используем её соединение; фиксация — при её завершении
+            yield unit_of_work.connection
+            return
+
+        conn = self._acquire()
+        discard = False
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Для доступа к колонкам по имени
             yield conn
         except Exception as e:
-            if conn:
+            try:
                 conn.rollback()
+            except sqlite3.Error:
+                discard = True
             raise e
         finally:
-            if conn:
-                conn.close()
-    
+            self._release(conn, discard)
+
     def execute_query(self, query: str, params: tuple = ()) -> list:
         with self.get_connection() as conn:
             cursor = conn.execute(query, params)
             return cursor.fetchall()
+
+    def execute_query_tuples(self, query: str, params: tuple = ()) -> list[tuple]:
+        # Строки обычными кортежами — для отображения по позиции в горячих списках,
+        # где sqlite3.Row и доступ по имени колонки заметно дороже самих данных
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(query, params).fetchall()
     
-    def execute_update(self, query: str, params: tuple = ()) -> int:
+    def iterate_query(self, query: str, params: tuple = (), chunk_size: int = 1000):
+        # Построчная выдача большого результата: в памяти не больше chunk_size строк,
+        # соединение удерживается, пока генератор не исчерпан или не закрыт
         with self.get_connection() as conn:
             cursor = conn.execute(query, params)
-            conn.commit()
-            return cursor.lastrowid
-    
-    def execute_many(self, query: str, params_list: list) -> None:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def execute_update(self, query: str, params: tuple = ()) -> int:
+        return self._write(lambda conn: conn.execute(query, params).lastrowid)
+
+    def execute_many(self, query: str, params_list: list) -> int:
+        if not params_list:
+            return 0
+        return self._write(lambda conn: conn.executemany(query, params_list).rowcount)
+
+    def execute_write(self, query: str, params: tuple = ()) -> int:
+        # Внутри единицы работы запись входит в её транзакцию,
+        # иначе уходит в общую очередь писателя и применяется пачкой
+        if self.in_unit_of_work():
+            return self.execute_update(query, params)
+        return self._write_queue.submit(query, params).result()
+
+    @contextmanager
+    def write_transaction(self):
+        # Несколько записей одной транзакцией: внутри единицы работы — её транзакция,
+        # иначе отдельная транзакция под общим замком писателя
+        unit_of_work = self._current_unit_of_work.get()
+        if unit_of_work is not None:
+            unit_of_work.begin_write()
+            yield unit_of_work.connection
+            return
+
+        # Вложенная транзакция входит во внешнюю: несколько репозиториев пишут одной транзакцией
+        outer = getattr(self._local, 'write_conn', None)
+        if outer is not None:
+            yield outer
+            return
+
         with self.get_connection() as conn:
-            conn.executemany(query, params_list)
-            conn.commit()
+            self.acquire_write_lock()
+            self._local.write_conn = conn
+            try:
+                self.retry_on_busy(lambda: conn.execute("BEGIN IMMEDIATE"))
+                yield conn
+                self.retry_on_busy(conn.commit)
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                self._local.write_conn = None
+                self.release_write_lock()
+
+    def _write(self, statement):
+        with self.write_transaction() as conn:
+            return statement(conn)
+
+    def get_pool_stats(self) -> dict:
+        with self._condition:
+            idle = len(self._idle)
+            return {
+                'pool_size': self.pool_size,
+                'open': self._open_count,
+                'idle': idle,
+                'in_use': self._open_count - idle,
+                'cached_statements': self.cached_statements,
+                **self._stats,
+            }
+
+    def get_write_stats(self) -> dict:
+        return self._write_queue.get_stats()
+
+    def close_all(self):
+        self._write_queue.close()
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+            self._condition.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
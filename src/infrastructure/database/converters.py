@@ -0,0 +1,41 @@
+import sqlite3
+
+from datetime import date, datetime, time
+from functools import lru_cache
+
+
+# Колонки DATE, DATETIME, TIME и BOOLEAN превращаются в объекты Python внутри модуля sqlite3
+# (соединения открываются с detect_types=PARSE_DECLTYPES), а не в каждом _row_to_*.
+# Дат в школьном году несколько сотен, поэтому разобранные даты переиспользуются.
+
+@lru_cache(maxsize=4096)
+def convert_date(value: bytes) -> date:
+    text = value.decode()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return datetime.fromisoformat(text).date()
+
+
+def convert_datetime(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+@lru_cache(maxsize=1024)
+def convert_time(value: bytes) -> time:
+    return time.fromisoformat(value.decode())
+
+
+def convert_boolean(value: bytes) -> bool:
+    return value not in (b'0', b'')
+
+
+def register_converters():
+    # Запись: тот же текстовый формат, что и в уже накопленных данных
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+    sqlite3.register_adapter(time, time.isoformat)
+    sqlite3.register_converter('DATE', convert_date)
+    sqlite3.register_converter('DATETIME', convert_datetime)
+    sqlite3.register_converter('TIME', convert_time)
+    sqlite3.register_converter('BOOLEAN', convert_boolean)
@@ -0,0 +1,581 @@
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.database.schema import REBUILD_AGGREGATES_SQL
+
+
+# Номер применённой миграции хранится в заголовке файла базы (PRAGMA user_version):
+# при актуальной схеме старт процесса стоит чтения PRAGMA и проверки отметки массовой загрузки
+# вместо всех CREATE ... IF NOT EXISTS.
+# Изменения схемы — только новыми миграциями в конец MIGRATIONS; применённые миграции не правятся
+
+MIGRATION_BATCH_SIZE = 500  # учеников на транзакцию при заполнении данных
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    script: str = ''
+    # Заполнение данных после DDL: короткими транзакциями, чтобы не держать замок писателя;
+    # в транзакции каждой пачки вызывает переданную функцию продления захвата миграции
+    backfill: Callable[[DatabaseConnection, int, Callable[[sqlite3.Connection], None]], int] | None = None
+
+
+def split_statements(script: str) -> Iterator[str]:
+    # executescript фиксирует транзакцию сам, поэтому скрипт выполняется по одной команде;
+    # complete_statement не режет тела триггеров BEGIN ... END по внутренним «;»
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement.strip()
+            statement = ''
+    rest = '\n'.join(line for line in statement.splitlines() if not line.strip().startswith('--')).strip()
+    if rest:
+        raise ValueError(f"Незавершённая команда в миграции: {rest[:80]}")
+
+
+# Скрипты миграций заморожены: они уже применены к рабочим базам, и правка здесь
+# не дойдёт до них никогда. Новое изменение схемы — новая миграция в конце MIGRATIONS
+
+TABLES_V1_SQL = """
+-- Таблица пользователей
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(80) UNIQUE NOT NULL,
+    email VARCHAR(120) UNIQUE NOT NULL,
+    password_hash VARCHAR(128) NOT NULL,
+    role VARCHAR(20) NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Таблица учеников
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    class_name VARCHAR(50) NOT NULL,
+    user_id INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Таблица предметов
+CREATE TABLE IF NOT EXISTS subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    teacher VARCHAR(100) NOT NULL
+);
+
+-- Таблица оценок
+CREATE TABLE IF NOT EXISTS grades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    subject_id INTEGER NOT NULL,
+    grade INTEGER NOT NULL,
+    date DATE DEFAULT CURRENT_DATE,
+    comment TEXT,
+    FOREIGN KEY (student_id) REFERENCES students(id),
+    FOREIGN KEY (subject_id) REFERENCES subjects(id)
+);
+
+-- Таблица посещаемости
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    subject_id INTEGER NOT NULL,
+    date DATE DEFAULT CURRENT_DATE,
+    present BOOLEAN DEFAULT 1,
+    reason VARCHAR(200),
+    FOREIGN KEY (student_id) REFERENCES students(id),
+    FOREIGN KEY (subject_id) REFERENCES subjects(id)
+);
+
+-- Таблица расписания
+CREATE TABLE IF NOT EXISTS schedule (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_id INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    time_start TIME NOT NULL,
+    time_end TIME NOT NULL,
+    classroom VARCHAR(50),
+    FOREIGN KEY (subject_id) REFERENCES subjects(id)
+);
+
+-- Таблица связей родитель-ребенок
+CREATE TABLE IF NOT EXISTS parent_child (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    parent_id INTEGER NOT NULL,
+    child_id INTEGER NOT NULL,
+    relationship VARCHAR(50) DEFAULT 'parent',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (parent_id) REFERENCES users(id),
+    FOREIGN KEY (child_id) REFERENCES students(id)
+);
+
+-- Таблица связей учитель-предмет
+CREATE TABLE IF NOT EXISTS teacher_subject (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    teacher_id INTEGER NOT NULL,
+    subject_id INTEGER NOT NULL,
+    is_primary BOOLEAN DEFAULT 1,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (teacher_id) REFERENCES users(id),
+    FOREIGN KEY (subject_id) REFERENCES subjects(id)
+);
+
+-- Результаты ночной оценки риска неуспеваемости
+CREATE TABLE IF NOT EXISTS student_risk (
+    student_id INTEGER PRIMARY KEY,
+    score REAL NOT NULL,
+    average REAL,
+    trend REAL,
+    absence_rate REAL,
+    absence_streak INTEGER NOT NULL DEFAULT 0,
+    reasons TEXT,
+    computed_at DATETIME NOT NULL,
+    FOREIGN KEY (student_id) REFERENCES students(id)
+);
+"""
+
+INDEXES_V2_SQL = """
+-- Индексы подобраны под запросы репозиториев: условие и сортировка закрываются одним
+-- составным индексом. (student_id, date) без лишних колонок: порядок «date, id» ленты
+-- дневника и ночного пересчёта риска даёт rowid в конце индекса.
+-- Проверка планов: python check_query_plans.py
+CREATE INDEX IF NOT EXISTS idx_users_role_created ON users(role, created_at);
+CREATE INDEX IF NOT EXISTS idx_students_class_name ON students(class_name, name);
+CREATE INDEX IF NOT EXISTS idx_students_user_id ON students(user_id);
+CREATE INDEX IF NOT EXISTS idx_grades_subject ON grades(subject_id);
+CREATE INDEX IF NOT EXISTS idx_grades_date ON grades(date);
+CREATE INDEX IF NOT EXISTS idx_grades_student_date ON grades(student_id, date);
+CREATE INDEX IF NOT EXISTS idx_grades_student_subject_date ON grades(student_id, subject_id, date, grade);
+CREATE INDEX IF NOT EXISTS idx_attendance_subject_date ON attendance(subject_id, date);
+CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date);
+CREATE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance(student_id, date);
+CREATE INDEX IF NOT EXISTS idx_attendance_student_subject_date ON attendance(student_id, subject_id, date);
+CREATE INDEX IF NOT EXISTS idx_schedule_day_time ON schedule(day_of_week, time_start);
+CREATE INDEX IF NOT EXISTS idx_schedule_subject_day_time ON schedule(subject_id, day_of_week, time_start);
+CREATE INDEX IF NOT EXISTS idx_parent_child_parent ON parent_child(parent_id);
+CREATE INDEX IF NOT EXISTS idx_parent_child_child ON parent_child(child_id);
+CREATE INDEX IF NOT EXISTS idx_teacher_subject_teacher_subject ON teacher_subject(teacher_id, subject_id);
+CREATE INDEX IF NOT EXISTS idx_teacher_subject_subject ON teacher_subject(subject_id);
+CREATE INDEX IF NOT EXISTS idx_student_risk_rank ON student_risk(score DESC, student_id);
+
+-- Заменены составными индексами выше (users.username и users.email уже индексированы UNIQUE)
+DROP INDEX IF EXISTS idx_users_username;
+DROP INDEX IF EXISTS idx_users_email;
+DROP INDEX IF EXISTS idx_users_role;
+DROP INDEX IF EXISTS idx_students_class;
+DROP INDEX IF EXISTS idx_grades_student;
+DROP INDEX IF EXISTS idx_attendance_student;
+DROP INDEX IF EXISTS idx_attendance_subject;
+DROP INDEX IF EXISTS idx_schedule_day;
+DROP INDEX IF EXISTS idx_schedule_subject;
+DROP INDEX IF EXISTS idx_teacher_subject_teacher;
+DROP INDEX IF EXISTS idx_student_risk_score;
+"""
+
+# Агрегаты по ученику и предмету поддерживаются триггерами на grades и attendance,
+# поэтому средний балл и посещаемость читаются одной строкой без сканирования истории
+AGGREGATES_V3_SQL = """
+CREATE TABLE IF NOT EXISTS student_subject_stats (
+    student_id INTEGER NOT NULL,
+    subject_id INTEGER NOT NULL,
+    grade_sum INTEGER NOT NULL DEFAULT 0,
+    grade_count INTEGER NOT NULL DEFAULT 0,
+    last_grade_date DATE,
+    present_count INTEGER NOT NULL DEFAULT 0,
+    absent_count INTEGER NOT NULL DEFAULT 0,
+    last_attendance_date DATE,
+    PRIMARY KEY (student_id, subject_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_student_subject_stats_subject ON student_subject_stats(subject_id, student_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_stats_insert AFTER INSERT ON grades
+BEGIN
+    INSERT INTO student_subject_stats (student_id, subject_id, grade_sum, grade_count, last_grade_date)
+    VALUES (NEW.student_id, NEW.subject_id, NEW.grade, 1, NEW.date)
+    ON CONFLICT (student_id, subject_id) DO UPDATE SET
+        grade_sum = grade_sum + excluded.grade_sum,
+        grade_count = grade_count + 1,
+        last_grade_date = MAX(COALESCE(last_grade_date, excluded.last_grade_date), excluded.last_grade_date);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_stats_delete AFTER DELETE ON grades
+BEGIN
+    UPDATE student_subject_stats SET
+        grade_sum = grade_sum - OLD.grade,
+        grade_count = grade_count - 1,
+        last_grade_date = CASE WHEN last_grade_date = OLD.date THEN (
+            SELECT MAX(date) FROM grades WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id
+        ) ELSE last_grade_date END
+    WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_stats_update AFTER UPDATE OF student_id, subject_id, grade, date ON grades
+BEGIN
+    UPDATE student_subject_stats SET
+        grade_sum = grade_sum - OLD.grade,
+        grade_count = grade_count - 1,
+        last_grade_date = CASE WHEN last_grade_date = OLD.date THEN (
+            SELECT MAX(date) FROM grades
+            WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id AND id != NEW.id
+        ) ELSE last_grade_date END
+    WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id;
+    INSERT INTO student_subject_stats (student_id, subject_id, grade_sum, grade_count, last_grade_date)
+    VALUES (NEW.student_id, NEW.subject_id, NEW.grade, 1, NEW.date)
+    ON CONFLICT (student_id, subject_id) DO UPDATE SET
+        grade_sum = grade_sum + excluded.grade_sum,
+        grade_count = grade_count + 1,
+        last_grade_date = MAX(COALESCE(last_grade_date, excluded.last_grade_date), excluded.last_grade_date);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_stats_insert AFTER INSERT ON attendance
+BEGIN
+    INSERT INTO student_subject_stats (student_id, subject_id, present_count, absent_count, last_attendance_date)
+    VALUES (NEW.student_id, NEW.subject_id, NEW.present != 0, NEW.present = 0, NEW.date)
+    ON CONFLICT (student_id, subject_id) DO UPDATE SET
+        present_count = present_count + excluded.present_count,
+        absent_count = absent_count + excluded.absent_count,
+        last_attendance_date = MAX(COALESCE(last_attendance_date, excluded.last_attendance_date),
+                                   excluded.last_attendance_date);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_stats_delete AFTER DELETE ON attendance
+BEGIN
+    UPDATE student_subject_stats SET
+        present_count = present_count - (OLD.present != 0),
+        absent_count = absent_count - (OLD.present = 0),
+        last_attendance_date = CASE WHEN last_attendance_date = OLD.date THEN (
+            SELECT MAX(date) FROM attendance WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id
+        ) ELSE last_attendance_date END
+    WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_stats_update AFTER UPDATE OF student_id, subject_id, present, date ON attendance
+BEGIN
+    UPDATE student_subject_stats SET
+        present_count = present_count - (OLD.present != 0),
+        absent_count = absent_count - (OLD.present = 0),
+        last_attendance_date = CASE WHEN last_attendance_date = OLD.date THEN (
+            SELECT MAX(date) FROM attendance
+            WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id AND id != NEW.id
+        ) ELSE last_attendance_date END
+    WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id;
+    INSERT INTO student_subject_stats (student_id, subject_id, present_count, absent_count, last_attendance_date)
+    VALUES (NEW.student_id, NEW.subject_id, NEW.present != 0, NEW.present = 0, NEW.date)
+    ON CONFLICT (student_id, subject_id) DO UPDATE SET
+        present_count = present_count + excluded.present_count,
+        absent_count = absent_count + excluded.absent_count,
+        last_attendance_date = MAX(COALESCE(last_attendance_date, excluded.last_attendance_date),
+                                   excluded.last_attendance_date);
+END;
+
+-- Версия данных ученика растёт при любом изменении его оценок, посещаемости или профиля:
+-- по ней проверяется актуальность закэшированных представлений
+CREATE TABLE IF NOT EXISTS student_versions (
+    student_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_version_insert AFTER INSERT ON grades
+BEGIN
+    INSERT INTO student_versions (student_id, version) VALUES (NEW.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_version_delete AFTER DELETE ON grades
+BEGIN
+    INSERT INTO student_versions (student_id, version) VALUES (OLD.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grades_version_update AFTER UPDATE ON grades
+BEGIN
+    INSERT INTO student_versions (student_id, version) VALUES (OLD.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+    INSERT INTO student_versions (student_id, version) VALUES (NEW.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_version_insert AFTER INSERT ON attendance
+BEGIN
+    INSERT INTO student_versions (student_id, version) VALUES (NEW.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_version_delete AFTER DELETE ON attendance
+BEGIN
+    INSERT INTO student_versions (student_id, version) VALUES (OLD.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_attendance_version_update AFTER UPDATE ON attendance
+BEGIN
+    INSERT INTO student_versions (student_id, version) VALUES (OLD.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+    INSERT INTO student_versions (student_id, version) VALUES (NEW.student_id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_students_version_update AFTER UPDATE OF name, class_name ON students
+BEGIN
+    INSERT INTO student_versions (student_id, version) VALUES (NEW.id, 1)
+    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+END;
+"""
+
+
+TEACHER_CLASSES_V4_SQL = """
+-- Классы учителя назначаются явно: по ним учитель видит дневники, таблицу класса,
+-- журнал и перекличку. Предметы к классам не привязаны, поэтому teacher_subject для этого не годится
+CREATE TABLE IF NOT EXISTS teacher_class (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    teacher_id INTEGER NOT NULL,
+    class_name VARCHAR(50) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (teacher_id) REFERENCES users(id)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_teacher_class_teacher_class ON teacher_class(teacher_id, class_name);
+
+-- Назначения переносят видимость, действовавшую до миграции: учителю без предметов — все классы,
+-- остальным — классы, где по их предметам уже есть оценки или посещаемость
+INSERT OR IGNORE INTO teacher_class (teacher_id, class_name)
+SELECT u.id, st.class_name
+FROM users u
+CROSS JOIN (SELECT DISTINCT class_name FROM students) st
+WHERE u.role = 'teacher'
+  AND NOT EXISTS (SELECT 1 FROM teacher_subject ts WHERE ts.teacher_id = u.id)
+UNION
+SELECT ts.teacher_id, st.class_name
+FROM teacher_subject ts
+JOIN student_subject_stats ss ON ss.subject_id = ts.subject_id
+JOIN students st ON st.id = ss.student_id;
+"""
+
+
+BACKFILL_AGGREGATES_SQL = """
+INSERT INTO student_subject_stats (
+    student_id, subject_id, grade_sum, grade_count, last_grade_date,
+    present_count, absent_count, last_attendance_date
+)
+SELECT student_id, subject_id, SUM(grade_sum), SUM(grade_count), MAX(last_grade_date),
+       SUM(present_count), SUM(absent_count), MAX(last_attendance_date)
+FROM (
+    SELECT student_id, subject_id, SUM(grade) AS grade_sum, COUNT(*) AS grade_count,
+           MAX(date) AS last_grade_date, 0 AS present_count, 0 AS absent_count,
+           NULL AS last_attendance_date
+    FROM grades
+    WHERE student_id BETWEEN :first AND :last
+    GROUP BY student_id, subject_id
+    UNION ALL
+    SELECT student_id, subject_id, 0, 0, NULL,
+           SUM(present != 0), SUM(present = 0), MAX(date)
+    FROM attendance
+    WHERE student_id BETWEEN :first AND :last
+    GROUP BY student_id, subject_id
+)
+GROUP BY student_id, subject_id
+"""
+
+
+def backfill_aggregates(db: DatabaseConnection, batch_size: int,
+                        renew_claim: Callable[[sqlite3.Connection], None]) -> int:
+    # Агрегаты по накопленной истории, диапазонами student_id. Триггеры уже созданы,
+    # поэтому записи, сделанные между пачками, учитываются: каждая пачка пересчитывает
+    # свой диапазон целиком в одной транзакции с чтением grades и attendance
+    last_id = db.execute_query(
+        "SELECT MAX(COALESCE((SELECT MAX(student_id) FROM grades), 0),"
+        " COALESCE((SELECT MAX(student_id) FROM attendance), 0))"
+    )[0][0]
+    rows = 0
+    for first in range(0, last_id + 1, batch_size):
+        params = {'first': first, 'last': first + batch_size - 1}
+        with db.write_transaction() as conn:
+            renew_claim(conn)
+            conn.execute("DELETE FROM student_subject_stats WHERE student_id BETWEEN :first AND :last", params)
+            rows += conn.execute(BACKFILL_AGGREGATES_SQL, params).rowcount
+    return rows
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, 'Основные таблицы', TABLES_V1_SQL),
+    Migration(2, 'Составные индексы под запросы репозиториев', INDEXES_V2_SQL),
+    Migration(3, 'Агрегаты student_subject_stats и версии учеников', AGGREGATES_V3_SQL,
+              backfill=backfill_aggregates),
+    Migration(4, 'Явные назначения учителей на классы', TEACHER_CLASSES_V4_SQL),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+# Миграцию с заполнением данных процесс захватывает строкой в migration_claims в той же
+# транзакции, что и DDL. Остальные процессы ждут её завершения; захват без продления
+# дольше CLAIM_TIMEOUT считается брошенным (процесс упал) и перехватывается
+CLAIMS_SQL = """
+CREATE TABLE IF NOT EXISTS migration_claims (
+    version INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    renewed_at REAL NOT NULL
+)
+"""
+
+CLAIM_TIMEOUT = 60.0  # секунды без продления захвата
+CLAIM_POLL_INTERVAL = 0.5
+
+
+# Массовая загрузка в пустую базу снимает индексы и триггеры grades и attendance. До снятия их DDL
+# сохраняется в bulk_load_restore, а загрузка захватывается строкой migration_claims с версией
+# BULK_LOAD_CLAIM; если процесс загрузки убит, migrate() при старте вернёт их и пересчитает агрегаты
+BULK_LOAD_CLAIM = 0
+
+BULK_LOAD_RESTORE_SQL = """
+CREATE TABLE IF NOT EXISTS bulk_load_restore (
+    name TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    sql TEXT NOT NULL
+)
+"""
+
+
+def get_schema_version(db: DatabaseConnection) -> int:
+    return db.execute_query("PRAGMA user_version")[0][0]
+
+
+def has_bulk_load_restore(db: DatabaseConnection) -> bool:
+    return bool(db.execute_query(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bulk_load_restore'"
+    ))
+
+
+def restore_bulk_load(db: DatabaseConnection, report: Callable[[str], None] | None = None) -> bool:
+    if not has_bulk_load_restore(db):
+        return False
+    while True:
+        state = _start_bulk_load_restore(db)
+        if state != 'busy':
+            break
+        # Загрузка ещё идёт в другом процессе: ждём, пока она вернёт индексы сама или бросит захват
+        time.sleep(CLAIM_POLL_INTERVAL)
+    if state == 'restored' and report:
+        report("Индексы и триггеры прерванной массовой загрузки восстановлены, агрегаты пересчитаны")
+    return state == 'restored'
+
+
+def _start_bulk_load_restore(db: DatabaseConnection) -> str:
+    # 'done' — восстанавливать нечего, 'busy' — загрузка жива, 'restored' — восстановил этот процесс
+    with db.write_transaction() as conn:
+        if not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bulk_load_restore'"
+        ).fetchone():
+            return 'done'
+        conn.execute(CLAIMS_SQL)
+        claim = conn.execute(
+            "SELECT renewed_at FROM migration_claims WHERE version = ?", (BULK_LOAD_CLAIM,)
+        ).fetchone()
+        if claim is not None and time.time() - claim['renewed_at'] < CLAIM_TIMEOUT:
+            return 'busy'
+        finish_bulk_load(conn)
+        return 'restored'
+
+
+def finish_bulk_load(conn: sqlite3.Connection):
+    # Выполняется в транзакции писателя: индексы, триггеры, пересчёт агрегатов и снятие отметки
+    # фиксируются вместе, поэтому сбой на этом шаге оставляет отметку для следующего старта
+    rows = conn.execute(
+        "SELECT type, sql FROM bulk_load_restore "
+        "WHERE name NOT IN (SELECT name FROM sqlite_master) ORDER BY rowid"
+    ).fetchall()
+    for row in rows:
+        conn.execute(row['sql'])
+    if conn.execute("SELECT 1 FROM bulk_load_restore WHERE type = 'trigger' LIMIT 1").fetchone():
+        for statement in split_statements(REBUILD_AGGREGATES_SQL):
+            conn.execute(statement)
+    conn.execute("DROP TABLE bulk_load_restore")
+    conn.execute("DELETE FROM migration_claims WHERE version = ?", (BULK_LOAD_CLAIM,))
+
+
+def migrate(db: DatabaseConnection, batch_size: int = MIGRATION_BATCH_SIZE,
+            report: Callable[[str], None] | None = None) -> list[Migration]:
+    # Прерванная массовая загрузка оставила бы grades и attendance без индексов и триггеров
+    restore_bulk_load(db, report)
+    if get_schema_version(db) >= LATEST_VERSION:
+        return []
+
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    applied = []
+    for migration in MIGRATIONS:
+        started = time.perf_counter()
+        while True:
+            state = _start_migration(db, migration, owner)
+            if state != 'busy':
+                break
+            # Миграцию выполняет другой процесс: ждём, пока он поднимет версию или бросит захват
+            time.sleep(CLAIM_POLL_INTERVAL)
+        if state == 'applied':
+            continue
+
+        if migration.backfill is not None:
+            def renew_claim(conn: sqlite3.Connection, version: int = migration.version):
+                # Продление в транзакции пачки: потерянный захват останавливает заполнение
+                renewed = conn.execute(
+                    "UPDATE migration_claims SET renewed_at = ? WHERE version = ? AND owner = ?",
+                    (time.time(), version, owner)
+                ).rowcount
+                if not renewed:
+                    raise sqlite3.OperationalError(f"Миграция {version} перехвачена другим процессом")
+
+            # Пачки повторяемы: перехвативший захват процесс начинает заполнение заново
+            rows = migration.backfill(db, batch_size, renew_claim)
+            with db.write_transaction() as conn:
+                renew_claim(conn)
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+                conn.execute("DELETE FROM migration_claims WHERE version = ?", (migration.version,))
+            if report:
+                report(f"  заполнено строк: {rows}")
+
+        applied.append(migration)
+        if report:
+            report(f"Миграция {migration.version}: {migration.description} "
+                   f"({time.perf_counter() - started:.1f} с)")
+    return applied
+
+
+def _start_migration(db: DatabaseConnection, migration: Migration, owner: str) -> str:
+    # Проверка под BEGIN IMMEDIATE: параллельно стартующие процессы применяют миграцию один раз.
+    # 'applied' — уже применена, 'busy' — выполняется другим процессом, 'claimed' — выполняет этот
+    with db.write_transaction() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= migration.version:
+            return 'applied'
+        if migration.backfill is None:
+            for statement in split_statements(migration.script):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+            return 'claimed'
+
+        conn.execute(CLAIMS_SQL)
+        claim = conn.execute(
+            "SELECT owner, renewed_at FROM migration_claims WHERE version = ?", (migration.version,)
+        ).fetchone()
+        if claim is not None and time.time() - claim['renewed_at'] < CLAIM_TIMEOUT:
+            return 'busy'
+        # При перехвате DDL уже зафиксирован прежним владельцем; скрипт из IF NOT EXISTS повторяется без вреда
+        for statement in split_statements(migration.script):
+            conn.execute(statement)
+        conn.execute(
+            "INSERT OR REPLACE INTO migration_claims (version, owner, renewed_at) VALUES (?, ?, ?)",
+            (migration.version, owner, time.time())
+        )
+        return 'claimed'
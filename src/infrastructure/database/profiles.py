@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+TEMP_STORES = ('DEFAULT', 'FILE', 'MEMORY')
+
+
+@dataclass(frozen=True)
+class DatabaseProfile:
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    mmap_size: int = 256 * 1024 * 1024  # байты
+    cache_size: int = -64 * 1024  # отрицательное значение — размер в КиБ
+    busy_timeout: int = 5000  # миллисекунды
+    temp_store: str = 'MEMORY'
+
+    def __post_init__(self):
+        # Значения подставляются прямо в PRAGMA, поэтому проверяем их заранее
+        if self.journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Неизвестный journal_mode: {self.journal_mode}")
+        if self.synchronous.upper() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Неизвестный уровень synchronous: {self.synchronous}")
+        if self.temp_store.upper() not in TEMP_STORES:
+            raise ValueError(f"Неизвестный temp_store: {self.temp_store}")
+
+    def pragmas(self) -> list[str]:
+        # busy_timeout первым: смена journal_mode сама может ждать блокировку
+        return [
+            f"PRAGMA busy_timeout = {int(self.busy_timeout)}",
+            f"PRAGMA journal_mode = {self.journal_mode.upper()}",
+            f"PRAGMA synchronous = {self.synchronous.upper()}",
+            f"PRAGMA mmap_size = {int(self.mmap_size)}",
+            f"PRAGMA cache_size = {int(self.cache_size)}",
+            f"PRAGMA temp_store = {self.temp_store.upper()}",
+        ]
+
+
+PROFILES = {
+    # Поведение SQLite по умолчанию
+    'default': DatabaseProfile(journal_mode='DELETE', synchronous='FULL', mmap_size=0,
+                               cache_size=-2000, temp_store='DEFAULT'),
+    # WAL: читатели не блокируют писателя и наоборот
+    'performance': DatabaseProfile(),
+}
+
+
+def get_profile(name: str) -> DatabaseProfile:
+    if name not in PROFILES:
+        raise ValueError(f"Неизвестный профиль базы данных: {name}")
+    return PROFILES[name]
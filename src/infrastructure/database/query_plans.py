@@ -0,0 +1,246 @@
+import sqlite3
+import threading
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable
+
+from domain.entities.attendance import Attendance
+from domain.entities.grade import Grade
+from domain.entities.student_risk import StudentRisk
+from domain.entities.user import UserRole
+from infrastructure.database.connection import DatabaseConnection
+
+
+# Признаки плохого плана: полный проход по таблице и сортировка во временном B-дереве.
+# Допущенные строки плана перечисляются в allow каждой проверки точно, а не по фрагменту
+BAD_PLAN_MARKERS = ('SCAN ', 'USE TEMP B-TREE')
+
+# Служебные команды, у которых нет плана
+_SKIPPED_PREFIXES = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE', 'PRAGMA', '--')
+
+SAMPLE_DATE = date(2024, 9, 2)
+
+
+@dataclass(frozen=True)
+class QueryCheck:
+    name: str
+    # Вызов репозитория (по словарю репозиториев) или готовый SQL — для запросов внутри триггеров
+    call: Callable[[dict[str, Any]], Any] | None = None
+    sql: str | None = None
+    params: tuple = ()
+    # Допустимые строки плана целиком, например 'SCAN grades USING COVERING INDEX ...':
+    # выборки, которым по смыслу нужна вся таблица. Любой другой план такого запроса — ошибка
+    allow: tuple[str, ...] = ()
+    reason: str = ''
+
+
+@dataclass
+class PlanResult:
+    check: QueryCheck
+    statement: str
+    plan: list[str]
+    problems: list[str] = field(default_factory=list)
+
+
+class TracingDatabaseConnection(DatabaseConnection):
+    # Запоминает каждый выполненный запрос с подставленными параметрами
+
+    def __init__(self, *args, **kwargs):
+        self.statements: list[str] = []
+        self._trace_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = super()._create_connection()
+        conn.set_trace_callback(self._trace)
+        return conn
+
+    def _trace(self, statement: str):
+        with self._trace_lock:
+            self.statements.append(statement)
+
+    def take_statements(self) -> list[str]:
+        with self._trace_lock:
+            statements, self.statements = self.statements, []
+        # executemany и триггеры повторяют один и тот же запрос — план нужен один раз
+        return list(dict.fromkeys(
+            statement.strip() for statement in statements
+            if not statement.lstrip().upper().startswith(_SKIPPED_PREFIXES)
+        ))
+
+
+SAMPLE_DATA_SQL = """
+INSERT INTO users (id, username, email, password_hash, role, first_name, last_name)
+VALUES (1, 'teacher', 'teacher@school.ru', '-', 'teacher', 'Анна', 'Иванова'),
+       (2, 'parent', 'parent@school.ru', '-', 'parent', 'Олег', 'Петров');
+INSERT INTO students (id, name, class_name, user_id) VALUES (1, 'Иван Петров', '5А', NULL);
+INSERT INTO subjects (id, name, teacher) VALUES (1, 'Математика', 'Анна Иванова');
+INSERT INTO schedule (id, subject_id, day_of_week, time_start, time_end, classroom)
+VALUES (1, 1, 0, '08:30', '09:15', '101');
+INSERT INTO parent_child (id, parent_id, child_id) VALUES (1, 2, 1);
+INSERT INTO teacher_subject (id, teacher_id, subject_id) VALUES (1, 1, 1);
+INSERT INTO teacher_class (id, teacher_id, class_name) VALUES (1, 1, '5А');
+INSERT INTO grades (id, student_id, subject_id, grade, date, comment) VALUES (1, 1, 1, 5, '2024-09-02', '');
+INSERT INTO attendance (id, student_id, subject_id, date, present, reason) VALUES (1, 1, 1, '2024-09-02', 1, '');
+"""
+
+
+def _grade(grade_id: int | None = None) -> Grade:
+    return Grade(id=grade_id, student_id=1, subject_id=1, grade=4, date=SAMPLE_DATE, comment='')
+
+
+def _attendance(attendance_id: int | None = None) -> Attendance:
+    return Attendance(id=attendance_id, student_id=1, subject_id=1, date=SAMPLE_DATE, present=False, reason='')
+
+
+def _risk() -> StudentRisk:
+    return StudentRisk(student_id=1, score=10.0, average=4.0, trend=0.0, absence_rate=0.0,
+                       absence_streak=0, reasons=[], computed_at=datetime(2024, 9, 2))
+
+
+WHOLE_TABLE = 'выборка всей таблицы для списка или пакетной обработки'
+
+# Все запросы репозиториев. Проверка выполняет вызов на пустой базе со схемой приложения,
+# перехватывает выполненный SQL и разбирает EXPLAIN QUERY PLAN каждого запроса
+QUERY_PLAN_CHECKS: list[QueryCheck] = [
+    # Пользователи
+    QueryCheck('user.get_by_id', lambda r: r['user'].get_by_id(1)),
+    QueryCheck('user.get_by_username', lambda r: r['user'].get_by_username('teacher')),
+    QueryCheck('user.get_by_email', lambda r: r['user'].get_by_email('teacher@school.ru')),
+    QueryCheck('user.get_by_role', lambda r: r['user'].get_by_role(UserRole.TEACHER)),
+    QueryCheck('user.get_all', lambda r: r['user'].get_all(),
+               allow=('SCAN users', 'USE TEMP B-TREE FOR ORDER BY'), reason=WHOLE_TABLE),
+    # Ученики
+    QueryCheck('student.get_by_id', lambda r: r['student'].get_by_id(1)),
+    QueryCheck('student.get_by_user_id', lambda r: r['student'].get_by_user_id(1)),
+    QueryCheck('student.get_by_class', lambda r: r['student'].get_by_class('5А')),
+    QueryCheck('student.get_by_parent', lambda r: r['student'].get_by_parent(2),
+               allow=('USE TEMP B-TREE FOR ORDER BY',), reason='сортируются несколько детей одного родителя'),
+    QueryCheck('student.get_by_teacher', lambda r: r['student'].get_by_teacher(1),
+               allow=('USE TEMP B-TREE FOR ORDER BY',), reason='сортируются ученики нескольких классов учителя'),
+    QueryCheck('student.get_teacher_class_names', lambda r: r['student'].get_teacher_class_names(1)),
+    QueryCheck('student.is_owned_by_user', lambda r: r['student'].is_owned_by_user(1, 3)),
+    QueryCheck('student.has_parent', lambda r: r['student'].has_parent(1, 2)),
+    QueryCheck('student.is_in_teacher_classes', lambda r: r['student'].is_in_teacher_classes(1, 1)),
+    QueryCheck('student.get_all', lambda r: r['student'].get_all(),
+               allow=('SCAN students', 'USE TEMP B-TREE FOR ORDER BY'), reason=WHOLE_TABLE),
+    QueryCheck('student.get_class_names', lambda r: r['student'].get_class_names(),
+               allow=('SCAN students USING COVERING INDEX idx_students_class_name',), reason=WHOLE_TABLE),
+    # Предметы и расписание (читаются через кэш справочников; проверяются исходные репозитории)
+    QueryCheck('subject.get_by_id', lambda r: r['subject'].repository.get_by_id(1)),
+    QueryCheck('subject.get_by_name', lambda r: r['subject'].repository.get_by_name('Математика'),
+               allow=('SCAN subjects',), reason='справочник из десятков строк'),
+    QueryCheck('subject.get_all', lambda r: r['subject'].repository.get_all(),
+               allow=('SCAN subjects', 'USE TEMP B-TREE FOR ORDER BY'), reason='справочник из десятков строк'),
+    QueryCheck('schedule.get_by_id', lambda r: r['schedule'].repository.get_by_id(1)),
+    QueryCheck('schedule.get_by_day', lambda r: r['schedule'].repository.get_by_day(0)),
+    QueryCheck('schedule.get_by_subject', lambda r: r['schedule'].repository.get_by_subject(1)),
+    QueryCheck('schedule.get_all', lambda r: r['schedule'].repository.get_all(),
+               allow=('SCAN schedule USING INDEX idx_schedule_day_time',), reason=WHOLE_TABLE),
+    # Оценки
+    QueryCheck('grade.get_by_id', lambda r: r['grade'].get_by_id(1)),
+    QueryCheck('grade.get_by_student', lambda r: r['grade'].get_by_student(1)),
+    QueryCheck('grade.get_page_by_student', lambda r: r['grade'].get_page_by_student(
+        1, 51, (SAMPLE_DATE, 10), date(2024, 9, 1), date(2024, 12, 31))),
+    QueryCheck('grade.get_by_student_and_subject', lambda r: r['grade'].get_by_student_and_subject(1, 1)),
+    QueryCheck('grade.get_by_date_range', lambda r: r['grade'].get_by_date_range(SAMPLE_DATE, date(2024, 9, 30))),
+    QueryCheck('grade.iter_statistics_rows', lambda r: list(r['grade'].iter_statistics_rows([1, 2], 1))),
+    QueryCheck('grade.iter_statistics_rows (все предметы)', lambda r: list(r['grade'].iter_statistics_rows([1, 2]))),
+    QueryCheck('grade.iter_statistics_rows (школа, предмет)', lambda r: list(r['grade'].iter_statistics_rows(None, 1))),
+    QueryCheck('grade.iter_statistics_rows (школа)', lambda r: list(r['grade'].iter_statistics_rows()),
+               allow=('SCAN grades USING COVERING INDEX idx_grades_student_subject_date',),
+               reason='статистика по всем оценкам школы (только для администратора)'),
+    QueryCheck('grade.create', lambda r: r['grade'].create(_grade())),
+    QueryCheck('grade.create_many', lambda r: r['grade'].create_many([_grade(), _grade()])),
+    QueryCheck('grade.update', lambda r: r['grade'].update(_grade(1))),
+    QueryCheck('grade.delete', lambda r: r['grade'].delete(2)),
+    # Посещаемость
+    QueryCheck('attendance.get_by_id', lambda r: r['attendance'].get_by_id(1)),
+    QueryCheck('attendance.get_by_student', lambda r: r['attendance'].get_by_student(1)),
+    QueryCheck('attendance.get_page_by_student', lambda r: r['attendance'].get_page_by_student(
+        1, 51, (SAMPLE_DATE, 10), date(2024, 9, 1), date(2024, 12, 31))),
+    QueryCheck('attendance.get_by_student_and_subject',
+               lambda r: r['attendance'].get_by_student_and_subject(1, 1)),
+    QueryCheck('attendance.get_by_date_range',
+               lambda r: r['attendance'].get_by_date_range(SAMPLE_DATE, date(2024, 9, 30))),
+    QueryCheck('attendance.get_by_lesson', lambda r: r['attendance'].get_by_lesson(1, SAMPLE_DATE)),
+    QueryCheck('attendance.create', lambda r: r['attendance'].create(_attendance())),
+    QueryCheck('attendance.create_many', lambda r: r['attendance'].create_many([_attendance()])),
+    QueryCheck('attendance.update', lambda r: r['attendance'].update(_attendance(1))),
+    QueryCheck('attendance.delete', lambda r: r['attendance'].delete(2)),
+    # Связи родитель-ребёнок
+    QueryCheck('parent_child.get_by_id', lambda r: r['parent_child'].get_by_id(1)),
+    QueryCheck('parent_child.get_by_parent', lambda r: r['parent_child'].get_by_parent(2)),
+    QueryCheck('parent_child.get_by_child', lambda r: r['parent_child'].get_by_child(1)),
+    QueryCheck('parent_child.get_all', lambda r: r['parent_child'].get_all(),
+               allow=('SCAN parent_child USING INDEX idx_parent_child_parent',), reason=WHOLE_TABLE),
+    # Агрегаты
+    QueryCheck('stats.get', lambda r: r['stats'].get(1, 1)),
+    QueryCheck('stats.get_by_student', lambda r: r['stats'].get_by_student(1)),
+    QueryCheck('stats.get_by_students', lambda r: r['stats'].get_by_students([1, 2, 3])),
+    QueryCheck('stats.get_class_cells', lambda r: r['stats'].get_class_cells('5А', 3),
+               allow=('SCAN class_students', 'SCAN (subquery-6)', 'USE TEMP B-TREE FOR RIGHT PART OF ORDER BY'),
+               reason='оценки класса уже выбраны по индексу; досортировка по дате внутри пары ученик-предмет'),
+    QueryCheck('stats.get_class_version', lambda r: r['stats'].get_class_version('5А')),
+    QueryCheck('stats.get_students_version', lambda r: r['stats'].get_students_version([1, 2, 3])),
+    QueryCheck('stats.rebuild', lambda r: r['stats'].rebuild(),
+               allow=('SCAN grades USING COVERING INDEX idx_grades_student_subject_date',
+                      'SCAN attendance USING INDEX idx_attendance_student_subject_date',
+                      'SCAN (subquery-2)', 'USE TEMP B-TREE FOR GROUP BY',
+                      'SCAN students USING COVERING INDEX idx_students_user_id',
+                      'SCAN student_subject_stats USING COVERING INDEX idx_student_subject_stats_subject'),
+               reason='полный пересчёт агрегатов'),
+    # Отчёты и риск
+    QueryCheck('report.iter_subject_journal', lambda r: list(r['report'].iter_subject_journal([1, 2], 1))),
+    QueryCheck('report.iter_subject_journal (все предметы)', lambda r: list(r['report'].iter_subject_journal([1, 2]))),
+    QueryCheck('report.get_subject_days', lambda r: r['report'].get_subject_days(1, [1, 2])),
+    QueryCheck('report.get_subject_totals', lambda r: r['report'].get_subject_totals(1, [1, 2])),
+    QueryCheck('risk.iter_grades', lambda r: list(r['risk'].iter_grades(SAMPLE_DATE, (4, 1))),
+               allow=('SCAN grades USING INDEX idx_grades_student_date',), reason='ночной пересчёт по всем ученикам'),
+    QueryCheck('risk.iter_attendance', lambda r: list(r['risk'].iter_attendance(SAMPLE_DATE, (4, 1))),
+               allow=('SCAN attendance USING INDEX idx_attendance_student_date',), reason='ночной пересчёт по всем ученикам'),
+    QueryCheck('risk.get_top', lambda r: r['risk'].get_top(20),
+               allow=('SCAN student_risk USING INDEX idx_student_risk_rank',), reason='первые строки по индексу рейтинга'),
+    QueryCheck('risk.replace_all', lambda r: r['risk'].replace_all([_risk()])),
+    # Запросы внутри триггеров student_subject_stats
+    QueryCheck('trigger: последняя дата оценки',
+               sql="SELECT MAX(date) FROM grades WHERE student_id = ? AND subject_id = ? AND id != ?",
+               params=(1, 1, 1)),
+    QueryCheck('trigger: последняя дата посещаемости',
+               sql="SELECT MAX(date) FROM attendance WHERE student_id = ? AND subject_id = ? AND id != ?",
+               params=(1, 1, 1)),
+    QueryCheck('trigger: обновление агрегата',
+               sql="UPDATE student_subject_stats SET grade_count = grade_count - 1 WHERE student_id = ? AND subject_id = ?",
+               params=(1, 1)),
+]
+
+
+def explain(conn: sqlite3.Connection, statement: str, params: tuple = ()) -> list[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", params)]
+
+
+def find_problems(plan: list[str], allow: tuple[str, ...]) -> list[str]:
+    return [
+        detail for detail in plan
+        if any(marker in detail for marker in BAD_PLAN_MARKERS)
+        and detail not in allow
+    ]
+
+
+def check_query_plans(db: TracingDatabaseConnection, repositories: dict[str, Any],
+                      checks: list[QueryCheck] | None = None) -> list[PlanResult]:
+    # Базу нужно заранее создать по схеме приложения и заполнить SAMPLE_DATA_SQL
+    results = []
+    for check in checks or QUERY_PLAN_CHECKS:
+        if check.sql is not None:
+            statements = [(check.sql, check.params)]
+        else:
+            db.take_statements()
+            check.call(repositories)
+            statements = [(statement, ()) for statement in db.take_statements()]
+        with db.get_connection() as conn:
+            for statement, params in statements:
+                plan = explain(conn, statement, params)
+                results.append(PlanResult(check, statement, plan, find_problems(plan, check.allow)))
+    return results
@@ -1,109 +1,30 @@
-CREATE_TABLES_SQL = """
--- Таблица пользователей
-CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username VARCHAR(80) UNIQUE NOT NULL,
-    email VARCHAR(120) UNIQUE NOT NULL,
-    password_hash VARCHAR(128) NOT NULL,
-    role VARCHAR(20) NOT NULL,
-    first_name VARCHAR(50) NOT NULL,
-    last_name VARCHAR(50) NOT NULL,
-    is_active BOOLEAN DEFAULT 1,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-
--- Таблица учеников
-CREATE TABLE IF NOT EXISTS students (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name VARCHAR(100) NOT NULL,
-    class_name VARCHAR(50) NOT NULL,
-    user_id INTEGER,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id)
-);
-
--- Таблица предметов
-CREATE TABLE IF NOT EXISTS subjects (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name VARCHAR(100) NOT NULL,
-    teacher VARCHAR(100) NOT NULL
-);
-
--- Таблица оценок
-CREATE TABLE IF NOT EXISTS grades (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    student_id INTEGER NOT NULL,
-    subject_id INTEGER NOT NULL,
-    grade INTEGER NOT NULL,
-    date DATE DEFAULT CURRENT_DATE,
-    comment TEXT,
-    FOREIGN KEY (student_id) REFERENCES students(id),
-    FOREIGN KEY (subject_id) REFERENCES subjects(id)
-);
-
--- Таблица посещаемости
-CREATE TABLE IF NOT EXISTS attendance (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    student_id INTEGER NOT NULL,
-    subject_id INTEGER NOT NULL,
-    date DATE DEFAULT CURRENT_DATE,
-    present BOOLEAN DEFAULT 1,
-    reason VARCHAR(200),
-    FOREIGN KEY (student_id) REFERENCES students(id),
-    FOREIGN KEY (subject_id) REFERENCES subjects(id)
-);
-
--- Таблица расписания
-CREATE TABLE IF NOT EXISTS schedule (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    subject_id INTEGER NOT NULL,
-    day_of_week INTEGER NOT NULL,
-    time_start TIME NOT NULL,
-    time_end TIME NOT NULL,
-    classroom VARCHAR(50),
-    FOREIGN KEY (subject_id) REFERENCES subjects(id)
-);
-
--- Таблица связей родитель-ребенок
-CREATE TABLE IF NOT EXISTS parent_child (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    parent_id INTEGER NOT NULL,
-    child_id INTEGER NOT NULL,
-    relationship VARCHAR(50) DEFAULT 'parent',
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (parent_id) REFERENCES users(id),
-    FOREIGN KEY (child_id) REFERENCES students(id)
-);
-
--- Таблица связей учитель-предмет
-CREATE TABLE IF NOT EXISTS teacher_subject (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    teacher_id INTEGER NOT NULL,
-    subject_id INTEGER NOT NULL,
-    is_primary BOOLEAN DEFAULT 1,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (teacher_id) REFERENCES users(id),
-    FOREIGN KEY (subject_id) REFERENCES subjects(id)
-);
-"""
-
-INDEXES_SQL = """
--- Индексы для оптимизации запросов
-CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
-CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
-CREATE INDEX IF NOT EXISTS idx_students_class ON students(class_name);
-CREATE INDEX IF NOT EXISTS idx_students_user_id ON students(user_id);
-CREATE INDEX IF NOT EXISTS idx_grades_student ON grades(student_id);
-CREATE INDEX IF NOT EXISTS idx_grades_subject ON grades(subject_id);
-CREATE INDEX IF NOT EXISTS idx_grades_date ON grades(date);
-CREATE INDEX IF NOT EXISTS idx_attendance_student ON attendance(student_id);
-CREATE INDEX IF NOT EXISTS idx_attendance_subject ON attendance(subject_id);
-CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date);
-CREATE INDEX IF NOT EXISTS idx_schedule_day ON schedule(day_of_week);
-CREATE INDEX IF NOT EXISTS idx_schedule_subject ON schedule(subject_id);
-CREATE INDEX IF NOT EXISTS idx_parent_child_parent ON parent_child(parent_id);
-CREATE INDEX IF NOT EXISTS idx_parent_child_child ON parent_child(child_id);
-CREATE INDEX IF NOT EXISTS idx_teacher_subject_teacher ON teacher_subject(teacher_id);
-CREATE INDEX IF NOT EXISTS idx_teacher_subject_subject ON teacher_subject(subject_id);
+# Схема базы создаётся и меняется миграциями: infrastructure/database/migrations.py
+
+# Полный пересчёт агрегатов — после массовой загрузки или для сверки
+REBUILD_AGGREGATES_SQL = """
+DELETE FROM student_subject_stats;
+
+INSERT INTO student_subject_stats (
+    student_id, subject_id, grade_sum, grade_count, last_grade_date,
+    present_count, absent_count, last_attendance_date
+)
+SELECT student_id, subject_id, SUM(grade_sum), SUM(grade_count), MAX(last_grade_date),
+       SUM(present_count), SUM(absent_count), MAX(last_attendance_date)
+FROM (
+    SELECT student_id, subject_id, SUM(grade) AS grade_sum, COUNT(*) AS grade_count,
+           MAX(date) AS last_grade_date, 0 AS present_count, 0 AS absent_count,
+           NULL AS last_attendance_date
+    FROM grades
+    GROUP BY student_id, subject_id
+    UNION ALL
+    SELECT student_id, subject_id, 0, 0, NULL,
+           SUM(present != 0), SUM(present = 0), MAX(date)
+    FROM attendance
+    GROUP BY student_id, subject_id
+)
+GROUP BY student_id, subject_id;
+
+INSERT INTO student_versions (student_id, version)
+SELECT id, 1 FROM students WHERE true
+ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
 """
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from infrastructure.database.connection import DatabaseConnection
+
+
+# Одна транзакция и одно соединение на весь запрос: пока единица работы активна,
+# все репозитории, работающие через тот же DatabaseConnection, используют её соединение.
+# Соединение берётся из пула лениво — при первом обращении к базе.
+class UnitOfWork:
+
+    def __init__(self, db: DatabaseConnection, read_only: bool = False):
+        self.db = db
+        self.read_only = read_only
+        self._conn: sqlite3.Connection | None = None
+        self._token = None
+        self._writing = False
+        self._after_commit: list[Callable[[], None]] = []
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self.db._acquire()
+            if self.read_only:
+                # Отложенная транзакция: снимок данных фиксируется при первом чтении
+                self._conn.execute("BEGIN")
+        return self._conn
+
+    def begin_write(self):
+        if self._writing:
+            return
+        conn = self.connection
+        self.db.acquire_write_lock()
+        self._writing = True
+        try:
+            # Читающий снимок нельзя повысить до записи, если другой писатель уже успел
+            # зафиксировать изменения, поэтому завершаем его и сразу берём RESERVED-блокировку
+            if conn.in_transaction:
+                conn.commit()
+            self.db.retry_on_busy(lambda: conn.execute("BEGIN IMMEDIATE"))
+        except Exception:
+            self._release_write_lock()
+            raise
+
+    def on_commit(self, callback: Callable[[], None]):
+        # Колбэк выполнится только после успешной фиксации; при откате он отбрасывается
+        self._after_commit.append(callback)
+
+    def _run_after_commit(self):
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def begin(self) -> UnitOfWork:
+        self._token = self.db._current_unit_of_work.set(self)
+        return self
+
+    def commit(self):
+        try:
+            if self._conn is not None and self._conn.in_transaction:
+                self.db.retry_on_busy(self._conn.commit)
+        finally:
+            self._release_write_lock()
+        self._run_after_commit()
+
+    def rollback(self):
+        self._after_commit = []
+        try:
+            if self._conn is not None and self._conn.in_transaction:
+                self._conn.rollback()
+        finally:
+            self._release_write_lock()
+
+    def _release_write_lock(self):
+        if self._writing:
+            self._writing = False
+            self.db.release_write_lock()
+
+    def finish(self, error: BaseException | None = None):
+        conn, self._conn = self._conn, None
+        committed = False
+        try:
+            if conn is not None:
+                if error is None:
+                    self.db.retry_on_busy(conn.commit)
+                elif conn.in_transaction:
+                    conn.rollback()
+            committed = error is None
+        finally:
+            self._release_write_lock()
+            if conn is not None:
+                self.db._release(conn)
+            self._reset_context()
+            if not committed:
+                self._after_commit = []
+        self._run_after_commit()
+
+    def _reset_context(self):
+        if self._token is None:
+            return
+        try:
+            self.db._current_unit_of_work.reset(self._token)
+        except ValueError:
+            # Токен создан в другом контексте — просто снимаем привязку
+            self.db._current_unit_of_work.set(None)
+        self._token = None
+
+    def __enter__(self) -> UnitOfWork:
+        return self.begin()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(exc)
+        return False
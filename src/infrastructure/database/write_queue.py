@@ -0,0 +1,149 @@
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+
+def is_busy_error(error: Exception) -> bool:
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_busy(operation: Callable[[], T], max_retries: int = 5,
+                  retry_delay: float = 0.05, on_retry: Callable[[], None] | None = None) -> T:
+    # Экспоненциальная задержка со случайным разбросом, чтобы конкурирующие писатели не просыпались одновременно
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt >= max_retries:
+                raise
+            if on_retry:
+                on_retry()
+            time.sleep(retry_delay * (2 ** attempt) * (1 + random.random()))
+            attempt += 1
+
+
+class WriteQueue:
+    # Единственный писатель: фоновый поток с отдельным соединением забирает накопившиеся
+    # INSERT/UPDATE из очереди и применяет их пачкой в одной транзакции.
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], write_lock: threading.Lock,
+                 batch_size: int = 100, max_retries: int = 5, retry_delay: float = 0.05):
+        self._connect = connect
+        self._write_lock = write_lock
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'batches': 0,
+            'max_batch': 0,
+            'retries': 0,
+            'failed': 0,
+        }
+
+    def submit(self, query: str, params: tuple = ()) -> Future:
+        future = Future()
+        self._ensure_started()
+        self._queue.put((query, params, future))
+        self._stats['submitted'] += 1
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)
+                        break
+                    batch.append(item)
+                self._apply(conn, batch)
+        finally:
+            conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, batch: list):
+        self._stats['batches'] += 1
+        self._stats['max_batch'] = max(self._stats['max_batch'], len(batch))
+        try:
+            results = self._execute_with_retry(conn, batch)
+        except sqlite3.OperationalError as e:
+            if is_busy_error(e) or len(batch) == 1:
+                self._fail(batch, e)
+                return
+            results = None
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            results = None
+
+        if results is None:
+            # Ошибка в одной из записей не должна ронять всю пачку — применяем их по одной
+            for item in batch:
+                self._apply(conn, [item])
+            return
+
+        for (_, _, future), row_id in zip(batch, results):
+            future.set_result(row_id)
+
+    def _execute_with_retry(self, conn: sqlite3.Connection, batch: list) -> list[int]:
+        def execute():
+            with self._write_lock:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    results = [conn.execute(query, params).lastrowid for query, params, _ in batch]
+                    conn.commit()
+                    return results
+                except Exception:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    raise
+
+        return retry_on_busy(execute, self.max_retries, self.retry_delay, self._count_retry)
+
+    def _count_retry(self):
+        self._stats['retries'] += 1
+
+    def _fail(self, batch: list, error: Exception):
+        self._stats['failed'] += len(batch)
+        for _, _, future in batch:
+            future.set_exception(error)
+
+    def get_stats(self) -> dict:
+        return {'pending': self._queue.qsize(), 'batch_size': self.batch_size, **self._stats}
+
+    def close(self, timeout: float | None = None):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
@@ -3,6 +3,9 @@ from domain.entities.attendance import Attendance
 from domain.repositories.attendance_repository import IAttendanceRepository
 from infrastructure.database.connection import DatabaseConnection
 
+# Порядок колонок совпадает с полями Attendance: строка превращается в сущность по позиции
+ATTENDANCE_COLUMNS = "id, student_id, subject_id, date, present, reason"
+
 
 class AttendanceRepository(IAttendanceRepository):
     
@@ -14,7 +17,7 @@ class AttendanceRepository(IAttendanceRepository):
         INSERT INTO attendance (student_id, subject_id, date, present, reason)
         VALUES (?, ?, ?, ?, ?)
         """
-        attendance_id = self.db.execute_update(
+        attendance_id = self.db.execute_write(
             query,
             (attendance.student_id, attendance.subject_id, attendance.date, 
              attendance.present, attendance.reason)
@@ -22,35 +25,91 @@ class AttendanceRepository(IAttendanceRepository):
         attendance.id = attendance_id
         return attendance
     
+    def create_many(self, records: list[Attendance]) -> int:
+        # Повторная отметка того же урока заменяет прежние записи, а не дублирует их
+        delete_query = """
+        DELETE FROM attendance 
+        WHERE student_id = ? AND subject_id = ? AND date = ?
+        """
+        insert_query = """
+        INSERT INTO attendance (student_id, subject_id, date, present, reason)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        if not records:
+            return 0
+        with self.db.write_transaction() as conn:
+            conn.executemany(
+                delete_query,
+                [(record.student_id, record.subject_id, record.date) for record in records]
+            )
+            conn.executemany(
+                insert_query,
+                [(record.student_id, record.subject_id, record.date, record.present, record.reason)
+                 for record in records]
+            )
+        return len(records)
+    
     def get_by_id(self, attendance_id: int) -> Attendance | None:
-        query = "SELECT * FROM attendance WHERE id = ?"
-        rows = self.db.execute_query(query, (attendance_id,))
+        query = f"SELECT {ATTENDANCE_COLUMNS} FROM attendance WHERE id = ?"
+        rows = self.db.execute_query_tuples(query, (attendance_id,))
         if rows:
             return self._row_to_attendance(rows[0])
         return None
     
     def get_by_student(self, student_id: int) -> list[Attendance]:
-        query = "SELECT * FROM attendance WHERE student_id = ? ORDER BY date DESC"
-        rows = self.db.execute_query(query, (student_id,))
-        return [self._row_to_attendance(row) for row in rows]
+        query = f"SELECT {ATTENDANCE_COLUMNS} FROM attendance WHERE student_id = ? ORDER BY date DESC"
+        rows = self.db.execute_query_tuples(query, (student_id,))
+        return [Attendance(*row) for row in rows]
+    
+    def get_page_by_student(self, student_id: int, limit: int,
+                            before: tuple[date, int] | None = None,
+                            date_from: date | None = None,
+                            date_to: date | None = None) -> list[Attendance]:
+        # Ключевая пагинация по (date, id): следующая страница начинается строго после
+        # последней показанной записи, поэтому стоимость не растёт с глубиной истории
+        conditions = ["student_id = ?"]
+        params: list = [student_id]
+        if date_from:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("date <= ?")
+            params.append(date_to)
+        if before:
+            # Первое условие ограничивает диапазон по индексу (student_id, date)
+            conditions.append("date <= ? AND (date < ? OR id < ?)")
+            params.extend((before[0], before[0], before[1]))
+        query = f"""
+        SELECT {ATTENDANCE_COLUMNS} FROM attendance 
+        WHERE {' AND '.join(conditions)} 
+        ORDER BY date DESC, id DESC 
+        LIMIT ?
+        """
+        rows = self.db.execute_query_tuples(query, (*params, limit))
+        return [Attendance(*row) for row in rows]
     
     def get_by_student_and_subject(self, student_id: int, subject_id: int) -> list[Attendance]:
-        query = """
-        SELECT * FROM attendance 
+        query = f"""
+        SELECT {ATTENDANCE_COLUMNS} FROM attendance 
         WHERE student_id = ? AND subject_id = ? 
         ORDER BY date DESC
         """
-        rows = self.db.execute_query(query, (student_id, subject_id))
-        return [self._row_to_attendance(row) for row in rows]
+        rows = self.db.execute_query_tuples(query, (student_id, subject_id))
+        return [Attendance(*row) for row in rows]
     
     def get_by_date_range(self, start_date: date, end_date: date) -> list[Attendance]:
-        query = """
-        SELECT * FROM attendance 
+        query = f"""
+        SELECT {ATTENDANCE_COLUMNS} FROM attendance 
         WHERE date BETWEEN ? AND ? 
         ORDER BY date DESC
         """
-        rows = self.db.execute_query(query, (start_date, end_date))
-        return [self._row_to_attendance(row) for row in rows]
+        rows = self.db.execute_query_tuples(query, (start_date, end_date))
+        return [Attendance(*row) for row in rows]
+    
+    def get_by_lesson(self, subject_id: int, lesson_date: date) -> list[Attendance]:
+        query = f"SELECT {ATTENDANCE_COLUMNS} FROM attendance WHERE subject_id = ? AND date = ?"
+        rows = self.db.execute_query_tuples(query, (subject_id, lesson_date))
+        return [Attendance(*row) for row in rows]
     
     def update(self, attendance: Attendance) -> Attendance:
         query = """
@@ -70,12 +129,6 @@ class AttendanceRepository(IAttendanceRepository):
         self.db.execute_update(query, (attendance_id,))
         return True
     
-    def _row_to_attendance(self, row) -> Attendance:
-        return Attendance(
-            id=row['id'],
-            student_id=row['student_id'],
-            subject_id=row['subject_id'],
-            date=date.fromisoformat(row['date']),
-            present=bool(row['present']),
-            reason=row['reason']
-        )
+    def _row_to_attendance(self, row: tuple) -> Attendance:
+        # Даты уже разобраны конвертерами sqlite3 (см. infrastructure/database/converters.py)
+        return Attendance(*row)
@@ -0,0 +1,96 @@
+from domain.entities.schedule import Schedule
+from domain.entities.subject import Subject
+from domain.repositories.schedule_repository import IScheduleRepository
+from domain.repositories.subject_repository import ISubjectRepository
+from infrastructure.cache.reference_cache import ReferenceDataCache
+from infrastructure.database.connection import DatabaseConnection
+
+
+# Обёртки над репозиториями справочников: чтение из общего ReferenceDataCache,
+# запись — в базу со сбросом кэша. Возвращаемые объекты общие для всех запросов:
+# вызывающий код может лишь дополнять их производными полями вроде subject.
+
+class _CachedReferenceRepository:
+
+    def __init__(self, db_connection: DatabaseConnection, cache: ReferenceDataCache):
+        self.db = db_connection
+        self.cache = cache
+
+    def _invalidate(self):
+        # Сразу — чтобы текущий запрос увидел свои изменения, и после фиксации —
+        # чтобы параллельный запрос не успел закэшировать данные до неё
+        self.cache.invalidate()
+        self.db.after_commit(self.cache.invalidate)
+
+
+class CachedSubjectRepository(_CachedReferenceRepository, ISubjectRepository):
+
+    def __init__(self, repository: ISubjectRepository, db_connection: DatabaseConnection,
+                 cache: ReferenceDataCache):
+        super().__init__(db_connection, cache)
+        self.repository = repository
+
+    def create(self, subject: Subject) -> Subject:
+        subject = self.repository.create(subject)
+        self._invalidate()
+        return subject
+
+    def get_by_id(self, subject_id: int) -> Subject | None:
+        return self.get_all_by_id().get(subject_id)
+
+    def get_all(self) -> list[Subject]:
+        return list(self.cache.get_or_load('subjects', self.repository.get_all))
+
+    def get_all_by_id(self) -> dict[int, Subject]:
+        return self.cache.get_or_load(
+            'subjects_by_id', lambda: {subject.id: subject for subject in self.get_all()}
+        )
+
+    def get_by_name(self, name: str) -> Subject | None:
+        return next((subject for subject in self.get_all() if subject.name == name), None)
+
+    def update(self, subject: Subject) -> Subject:
+        subject = self.repository.update(subject)
+        self._invalidate()
+        return subject
+
+    def delete(self, subject_id: int) -> bool:
+        result = self.repository.delete(subject_id)
+        self._invalidate()
+        return result
+
+
+class CachedScheduleRepository(_CachedReferenceRepository, IScheduleRepository):
+
+    def __init__(self, repository: IScheduleRepository, db_connection: DatabaseConnection,
+                 cache: ReferenceDataCache):
+        super().__init__(db_connection, cache)
+        self.repository = repository
+
+    def create(self, schedule: Schedule) -> Schedule:
+        schedule = self.repository.create(schedule)
+        self._invalidate()
+        return schedule
+
+    def get_by_id(self, schedule_id: int) -> Schedule | None:
+        return next((item for item in self.get_all() if item.id == schedule_id), None)
+
+    def get_all(self) -> list[Schedule]:
+        return list(self.cache.get_or_load('schedule', self.repository.get_all))
+
+    def get_by_day(self, day_of_week: int) -> list[Schedule]:
+        # Полное расписание уже упорядочено по дню и времени начала
+        return [item for item in self.get_all() if item.day_of_week == day_of_week]
+
+    def get_by_subject(self, subject_id: int) -> list[Schedule]:
+        return [item for item in self.get_all() if item.subject_id == subject_id]
+
+    def update(self, schedule: Schedule) -> Schedule:
+        schedule = self.repository.update(schedule)
+        self._invalidate()
+        return schedule
+
+    def delete(self, schedule_id: int) -> bool:
+        result = self.repository.delete(schedule_id)
+        self._invalidate()
+        return result
@@ -1,7 +1,12 @@
 from datetime import date
+from typing import Iterable, Iterator
 from domain.entities.grade import Grade
 from domain.repositories.grade_repository import IGradeRepository
 from infrastructure.database.connection import DatabaseConnection
+from infrastructure.repositories.stats_repository import MAX_QUERY_PARAMS
+
+# Порядок колонок совпадает с полями Grade: строка превращается в сущность по позиции
+GRADE_COLUMNS = "id, student_id, subject_id, grade, date, comment"
 
 
 class GradeRepository(IGradeRepository):
@@ -14,42 +19,103 @@ class GradeRepository(IGradeRepository):
         INSERT INTO grades (student_id, subject_id, grade, date, comment)
         VALUES (?, ?, ?, ?, ?)
         """
-        grade_id = self.db.execute_update(
+        grade_id = self.db.execute_write(
             query,
             (grade.student_id, grade.subject_id, grade.grade, grade.date, grade.comment)
         )
         grade.id = grade_id
         return grade
     
+    def create_many(self, grades: list[Grade]) -> int:
+        query = """
+        INSERT INTO grades (student_id, subject_id, grade, date, comment)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        return self.db.execute_many(
+            query,
+            [(grade.student_id, grade.subject_id, grade.grade, grade.date, grade.comment)
+             for grade in grades]
+        )
+    
     def get_by_id(self, grade_id: int) -> Grade | None:
-        query = "SELECT * FROM grades WHERE id = ?"
-        rows = self.db.execute_query(query, (grade_id,))
+        query = f"SELECT {GRADE_COLUMNS} FROM grades WHERE id = ?"
+        rows = self.db.execute_query_tuples(query, (grade_id,))
         if rows:
             return self._row_to_grade(rows[0])
         return None
     
     def get_by_student(self, student_id: int) -> list[Grade]:
-        query = "SELECT * FROM grades WHERE student_id = ? ORDER BY date DESC"
-        rows = self.db.execute_query(query, (student_id,))
-        return [self._row_to_grade(row) for row in rows]
+        query = f"SELECT {GRADE_COLUMNS} FROM grades WHERE student_id = ? ORDER BY date DESC"
+        rows = self.db.execute_query_tuples(query, (student_id,))
+        return [Grade(*row) for row in rows]
+    
+    def get_page_by_student(self, student_id: int, limit: int,
+                            before: tuple[date, int] | None = None,
+                            date_from: date | None = None,
+                            date_to: date | None = None) -> list[Grade]:
+        # Ключевая пагинация по (date, id): следующая страница начинается строго после
+        # последней показанной записи, поэтому стоимость не растёт с глубиной истории
+        conditions = ["student_id = ?"]
+        params: list = [student_id]
+        if date_from:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("date <= ?")
+            params.append(date_to)
+        if before:
+            # Первое условие ограничивает диапазон по индексу (student_id, date)
+            conditions.append("date <= ? AND (date < ? OR id < ?)")
+            params.extend((before[0], before[0], before[1]))
+        query = f"""
+        SELECT {GRADE_COLUMNS} FROM grades 
+        WHERE {' AND '.join(conditions)} 
+        ORDER BY date DESC, id DESC 
+        LIMIT ?
+        """
+        rows = self.db.execute_query_tuples(query, (*params, limit))
+        return [Grade(*row) for row in rows]
+    
+    def iter_statistics_rows(self, student_ids: Iterable[int] | None = None,
+                             subject_id: int | None = None) -> Iterator[tuple[int, int, int, int]]:
+        # Кортежи (student_id, subject_id, день, оценка) для колоночной загрузки в статистику.
+        # Ученики фильтруются в SQL пачками по покрывающему индексу (student_id, subject_id, date, grade);
+        # student_ids=None — все оценки школы
+        select = "SELECT student_id, subject_id, CAST(julianday(date) AS INTEGER), grade FROM grades"
+        subject_filter = " AND subject_id = ?" if subject_id is not None else ""
+        subject_params = (subject_id,) if subject_id is not None else ()
+        
+        if student_ids is None:
+            query = select + (" WHERE subject_id = ?" if subject_id is not None else "")
+            for row in self.db.iterate_query(query, subject_params):
+                yield tuple(row)
+            return
+        
+        student_ids = sorted(set(student_ids))
+        for start in range(0, len(student_ids), MAX_QUERY_PARAMS):
+            chunk = student_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ', '.join('?' for _ in chunk)
+            query = f"{select} WHERE student_id IN ({placeholders}){subject_filter}"
+            for row in self.db.iterate_query(query, (*chunk, *subject_params)):
+                yield tuple(row)
     
     def get_by_student_and_subject(self, student_id: int, subject_id: int) -> list[Grade]:
-        query = """
-        SELECT * FROM grades 
+        query = f"""
+        SELECT {GRADE_COLUMNS} FROM grades 
         WHERE student_id = ? AND subject_id = ? 
         ORDER BY date DESC
         """
-        rows = self.db.execute_query(query, (student_id, subject_id))
-        return [self._row_to_grade(row) for row in rows]
+        rows = self.db.execute_query_tuples(query, (student_id, subject_id))
+        return [Grade(*row) for row in rows]
     
     def get_by_date_range(self, start_date: date, end_date: date) -> list[Grade]:
-        query = """
-        SELECT * FROM grades 
+        query = f"""
+        SELECT {GRADE_COLUMNS} FROM grades 
         WHERE date BETWEEN ? AND ? 
         ORDER BY date DESC
         """
-        rows = self.db.execute_query(query, (start_date, end_date))
-        return [self._row_to_grade(row) for row in rows]
+        rows = self.db.execute_query_tuples(query, (start_date, end_date))
+        return [Grade(*row) for row in rows]
     
     def update(self, grade: Grade) -> Grade:
         query = """
@@ -68,12 +134,6 @@ class GradeRepository(IGradeRepository):
         self.db.execute_update(query, (grade_id,))
         return True
     
-    def _row_to_grade(self, row) -> Grade:
-        return Grade(
-            id=row['id'],
-            student_id=row['student_id'],
-            subject_id=row['subject_id'],
-            grade=row['grade'],
-            date=date.fromisoformat(row['date']),
-            comment=row['comment']
-        )
+    def _row_to_grade(self, row: tuple) -> Grade:
+        # Даты уже разобраны конвертерами sqlite3 (см. infrastructure/database/converters.py)
+        return Grade(*row)
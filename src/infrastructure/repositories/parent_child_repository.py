@@ -0,0 +1,74 @@
+from datetime import datetime
+from domain.entities.user import ParentChild
+from domain.repositories.parent_child_repository import IParentChildRepository
+from infrastructure.database.connection import DatabaseConnection
+
+
+class ParentChildRepository(IParentChildRepository):
+    
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+    
+    def create(self, link: ParentChild) -> ParentChild:
+        query = """
+        INSERT INTO parent_child (parent_id, child_id, relationship, created_at)
+        VALUES (?, ?, ?, ?)
+        """
+        link_id = self.db.execute_update(
+            query,
+            (link.parent_id, link.child_id, link.relationship, datetime.utcnow())
+        )
+        link.id = link_id
+        return link
+    
+    def create_many(self, links: list[ParentChild]) -> int:
+        query = """
+        INSERT INTO parent_child (parent_id, child_id, relationship, created_at)
+        VALUES (?, ?, ?, ?)
+        """
+        now = datetime.utcnow()
+        return self.db.execute_many(
+            query,
+            [(link.parent_id, link.child_id, link.relationship, now) for link in links]
+        )
+    
+    def get_by_id(self, link_id: int) -> ParentChild | None:
+        query = "SELECT * FROM parent_child WHERE id = ?"
+        rows = self.db.execute_query(query, (link_id,))
+        if rows:
+            return self._row_to_parent_child(rows[0])
+        return None
+    
+    def get_all(self) -> list[ParentChild]:
+        query = "SELECT * FROM parent_child ORDER BY parent_id"
+        rows = self.db.execute_query(query)
+        return [self._row_to_parent_child(row) for row in rows]
+    
+    def get_by_parent(self, parent_id: int) -> list[ParentChild]:
+        query = "SELECT * FROM parent_child WHERE parent_id = ?"
+        rows = self.db.execute_query(query, (parent_id,))
+        return [self._row_to_parent_child(row) for row in rows]
+    
+    def get_by_child(self, child_id: int) -> list[ParentChild]:
+        query = "SELECT * FROM parent_child WHERE child_id = ?"
+        rows = self.db.execute_query(query, (child_id,))
+        return [self._row_to_parent_child(row) for row in rows]
+    
+    def update(self, link: ParentChild) -> ParentChild:
+        query = "UPDATE parent_child SET parent_id = ?, child_id = ?, relationship = ? WHERE id = ?"
+        self.db.execute_update(query, (link.parent_id, link.child_id, link.relationship, link.id))
+        return link
+    
+    def delete(self, link_id: int) -> bool:
+        query = "DELETE FROM parent_child WHERE id = ?"
+        self.db.execute_update(query, (link_id,))
+        return True
+    
+    def _row_to_parent_child(self, row) -> ParentChild:
+        return ParentChild(
+            id=row['id'],
+            parent_id=row['parent_id'],
+            child_id=row['child_id'],
+            relationship=row['relationship'],
+            created_at=row['created_at']
+        )
@@ -0,0 +1,77 @@
+from typing import Iterable, Iterator
+from domain.repositories.report_repository import IReportRepository
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.repositories.stats_repository import MAX_QUERY_PARAMS
+
+
+class ReportRepository(IReportRepository):
+    
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+    
+    def iter_subject_journal(self, student_ids: Iterable[int], subject_id: int | None = None) -> Iterator[dict]:
+        # Оценки и посещаемость учеников по предмету (или по всем предметам) в порядке
+        # (ученик, предмет, дата) индексов (student_id, subject_id, date): обе части UNION ALL
+        # сливаются без сортировки во временном B-дереве, и строки идут с курсора по мере потребления
+        subject_filter = " AND subject_id = ?" if subject_id is not None else ""
+        subject_params = (subject_id,) if subject_id is not None else ()
+        student_ids = sorted(set(student_ids))
+        for start in range(0, len(student_ids), MAX_QUERY_PARAMS // 2):
+            chunk = student_ids[start:start + MAX_QUERY_PARAMS // 2]
+            placeholders = ', '.join('?' for _ in chunk)
+            query = f"""
+            SELECT student_id, subject_id, date, grade, NULL AS present, comment AS note
+            FROM grades WHERE student_id IN ({placeholders}){subject_filter}
+            UNION ALL
+            SELECT student_id, subject_id, date, NULL, present, reason
+            FROM attendance WHERE student_id IN ({placeholders}){subject_filter}
+            ORDER BY student_id, subject_id, date
+            """
+            params = (*chunk, *subject_params, *chunk, *subject_params)
+            for row in self.db.iterate_query(query, params):
+                yield {
+                    'student_id': row['student_id'],
+                    'subject_id': row['subject_id'],
+                    'date': row['date'],
+                    'grade': row['grade'],
+                    'present': None if row['present'] is None else bool(row['present']),
+                    'note': row['note']
+                }
+    
+    def get_subject_days(self, subject_id: int, student_ids: Iterable[int]) -> list[tuple]:
+        # Ячейки таблицы отчёта, сгруппированные в SQL: (student_id, дата, оценка, присутствие).
+        # Из нескольких записей за день берётся последняя — строка с MAX(id)
+        result = []
+        student_ids = sorted(set(student_ids))
+        for start in range(0, len(student_ids), MAX_QUERY_PARAMS // 2):
+            chunk = student_ids[start:start + MAX_QUERY_PARAMS // 2]
+            placeholders = ', '.join('?' for _ in chunk)
+            query = f"""
+            SELECT student_id, date, grade, NULL AS present, MAX(id)
+            FROM grades WHERE subject_id = ? AND student_id IN ({placeholders})
+            GROUP BY student_id, date
+            UNION ALL
+            SELECT student_id, date, NULL, present, MAX(id)
+            FROM attendance WHERE subject_id = ? AND student_id IN ({placeholders})
+            GROUP BY student_id, date
+            """
+            rows = self.db.execute_query_tuples(query, (subject_id, *chunk, subject_id, *chunk))
+            result.extend(row[:4] for row in rows)
+        return result
+    
+    def get_subject_totals(self, subject_id: int, student_ids: Iterable[int]) -> dict[int, tuple[int, int, int, int]]:
+        # Итоги по ученику — из агрегатов student_subject_stats, которые ведут триггеры:
+        # (сумма оценок, число оценок, присутствий, пропусков) без чтения истории
+        result = {}
+        student_ids = sorted(set(student_ids))
+        for start in range(0, len(student_ids), MAX_QUERY_PARAMS):
+            chunk = student_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ', '.join('?' for _ in chunk)
+            query = f"""
+            SELECT student_id, grade_sum, grade_count, present_count, absent_count
+            FROM student_subject_stats
+            WHERE subject_id = ? AND student_id IN ({placeholders})
+            """
+            for row in self.db.execute_query_tuples(query, (subject_id, *chunk)):
+                result[row[0]] = row[1:]
+        return result
@@ -0,0 +1,67 @@
+import json
+from datetime import date
+from typing import Iterator
+from domain.entities.student_risk import StudentRisk
+from domain.repositories.risk_repository import IRiskRepository
+from infrastructure.database.connection import DatabaseConnection
+
+
+class RiskRepository(IRiskRepository):
+    
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+    
+    def iter_grades(self, since: date, partition: tuple[int, int] | None = None) -> Iterator[tuple[int, date, int]]:
+        # Порядок совпадает с индексом (student_id, date) — SQLite отдаёт строки без сортировки
+        for row in self.db.iterate_query(*self._ordered_query('grades', 'grade', since, partition)):
+            yield tuple(row)
+    
+    def iter_attendance(self, since: date, partition: tuple[int, int] | None = None) -> Iterator[tuple[int, date, bool]]:
+        for row in self.db.iterate_query(*self._ordered_query('attendance', 'present', since, partition)):
+            yield tuple(row)
+    
+    def _ordered_query(self, table: str, column: str, since: date,
+                       partition: tuple[int, int] | None) -> tuple[str, tuple]:
+        # partition = (число частей, номер части) — для параллельного прохода несколькими процессами
+        query = f"SELECT student_id, date, {column} FROM {table} WHERE date >= ?"
+        params: tuple = (since,)
+        if partition:
+            query += " AND student_id % ? = ?"
+            params += partition
+        return query + " ORDER BY student_id, date, id", params
+    
+    def replace_all(self, risks: list[StudentRisk]) -> int:
+        query = """
+        INSERT INTO student_risk (student_id, score, average, trend, absence_rate, absence_streak, reasons, computed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        with self.db.write_transaction() as conn:
+            conn.execute("DELETE FROM student_risk")
+            conn.executemany(
+                query,
+                [(risk.student_id, risk.score, risk.average, risk.trend, risk.absence_rate,
+                  risk.absence_streak, json.dumps(risk.reasons, ensure_ascii=False), risk.computed_at)
+                 for risk in risks]
+            )
+        return len(risks)
+    
+    def get_top(self, limit: int | None = None) -> list[StudentRisk]:
+        query = "SELECT * FROM student_risk ORDER BY score DESC, student_id"
+        params: tuple = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        rows = self.db.execute_query(query, params)
+        return [self._row_to_risk(row) for row in rows]
+    
+    def _row_to_risk(self, row) -> StudentRisk:
+        return StudentRisk(
+            student_id=row['student_id'],
+            score=row['score'],
+            average=row['average'],
+            trend=row['trend'],
+            absence_rate=row['absence_rate'],
+            absence_streak=row['absence_streak'],
+            reasons=json.loads(row['reasons']) if row['reasons'] else [],
+            computed_at=row['computed_at']
+        )
@@ -1,4 +1,3 @@
-from datetime import time
 from domain.entities.schedule import Schedule
 from domain.repositories.schedule_repository import IScheduleRepository
 from infrastructure.database.connection import DatabaseConnection
@@ -69,7 +68,7 @@ class ScheduleRepository(IScheduleRepository):
             id=row['id'],
             subject_id=row['subject_id'],
             day_of_week=row['day_of_week'],
-            time_start=time.fromisoformat(row['time_start']),
-            time_end=time.fromisoformat(row['time_end']),
+            time_start=row['time_start'],
+            time_end=row['time_end'],
             classroom=row['classroom']
         )
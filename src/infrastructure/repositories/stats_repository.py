@@ -0,0 +1,113 @@
+from domain.entities.subject_stats import SubjectStats, StudentStats
+from domain.repositories.stats_repository import IStatsRepository
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.database.schema import REBUILD_AGGREGATES_SQL
+
+# Старые сборки SQLite ограничивают запрос 999 параметрами
+MAX_QUERY_PARAMS = 900
+
+
+class StatsRepository(IStatsRepository):
+    # Только чтение: таблицу student_subject_stats обновляют триггеры на grades и attendance
+    
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+    
+    def get(self, student_id: int, subject_id: int) -> SubjectStats | None:
+        query = "SELECT * FROM student_subject_stats WHERE student_id = ? AND subject_id = ?"
+        rows = self.db.execute_query(query, (student_id, subject_id))
+        if rows:
+            return self._row_to_stats(rows[0])
+        return None
+    
+    def get_by_student(self, student_id: int) -> list[SubjectStats]:
+        query = "SELECT * FROM student_subject_stats WHERE student_id = ? ORDER BY subject_id"
+        rows = self.db.execute_query(query, (student_id,))
+        return [self._row_to_stats(row) for row in rows]
+    
+    def get_by_students(self, student_ids: list[int]) -> dict[int, StudentStats]:
+        # Один GROUP BY на пачку учеников вместо отдельного запроса на каждого
+        result = {}
+        student_ids = list(dict.fromkeys(student_ids))
+        for start in range(0, len(student_ids), MAX_QUERY_PARAMS):
+            chunk = student_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ', '.join('?' for _ in chunk)
+            query = f"""
+            SELECT student_id, SUM(grade_sum) AS grade_sum, SUM(grade_count) AS grade_count,
+                   SUM(present_count) AS present_count, SUM(absent_count) AS absent_count
+            FROM student_subject_stats
+            WHERE student_id IN ({placeholders})
+            GROUP BY student_id
+            """
+            for row in self.db.execute_query(query, tuple(chunk)):
+                result[row['student_id']] = StudentStats(
+                    student_id=row['student_id'],
+                    grade_sum=row['grade_sum'],
+                    grade_count=row['grade_count'],
+                    present_count=row['present_count'],
+                    absent_count=row['absent_count']
+                )
+        return result
+    
+    def get_class_cells(self, class_name: str, recent: int) -> list[tuple[int, int, int, int, int | None, int | None]]:
+        # Вся таблица класса одним запросом: сумма и число оценок из агрегатов
+        # плюс последние recent оценок по каждой паре ученик-предмет.
+        # Строка: student_id, subject_id, grade_sum, grade_count, номер с конца (1 — последняя), оценка
+        query = """
+        WITH class_students AS (
+            SELECT id FROM students WHERE class_name = ?
+        ),
+        recent_grades AS (
+            SELECT student_id, subject_id, grade,
+                   ROW_NUMBER() OVER (PARTITION BY student_id, subject_id ORDER BY date DESC, id DESC) AS position
+            FROM grades
+            WHERE student_id IN (SELECT id FROM class_students)
+        )
+        SELECT s.student_id, s.subject_id, s.grade_sum, s.grade_count, r.position, r.grade
+        FROM student_subject_stats s
+        LEFT JOIN recent_grades r
+            ON r.student_id = s.student_id AND r.subject_id = s.subject_id AND r.position <= ?
+        WHERE s.student_id IN (SELECT id FROM class_students) AND s.grade_count > 0
+        """
+        return [tuple(row) for row in self.db.execute_query(query, (class_name, recent))]
+    
+    def get_class_version(self, class_name: str) -> tuple[int, int, int]:
+        # Меняется при изменении состава класса или данных любого ученика в нём
+        query = """
+        SELECT COUNT(*), COALESCE(SUM(s.id), 0), COALESCE(SUM(v.version), 0)
+        FROM students s
+        LEFT JOIN student_versions v ON v.student_id = s.id
+        WHERE s.class_name = ?
+        """
+        return tuple(self.db.execute_query(query, (class_name,))[0])
+    
+    def get_students_version(self, student_ids: list[int]) -> int:
+        # Версии учеников только растут, поэтому сумма по фиксированному набору учеников
+        # меняется при любой записи оценок, посещаемости или профиля любого из них
+        version = 0
+        student_ids = list(dict.fromkeys(student_ids))
+        for start in range(0, len(student_ids), MAX_QUERY_PARAMS):
+            chunk = student_ids[start:start + MAX_QUERY_PARAMS]
+            placeholders = ', '.join('?' for _ in chunk)
+            query = f"SELECT COALESCE(SUM(version), 0) FROM student_versions WHERE student_id IN ({placeholders})"
+            version += self.db.execute_query_tuples(query, tuple(chunk))[0][0]
+        return version
+    
+    def rebuild(self) -> int:
+        with self.db.write_transaction() as conn:
+            for statement in REBUILD_AGGREGATES_SQL.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            return conn.execute("SELECT COUNT(*) FROM student_subject_stats").fetchone()[0]
+    
+    def _row_to_stats(self, row) -> SubjectStats:
+        return SubjectStats(
+            student_id=row['student_id'],
+            subject_id=row['subject_id'],
+            grade_sum=row['grade_sum'],
+            grade_count=row['grade_count'],
+            last_grade_date=row['last_grade_date'],
+            present_count=row['present_count'],
+            absent_count=row['absent_count'],
+            last_attendance_date=row['last_attendance_date']
+        )
@@ -1,13 +1,15 @@
 from datetime import datetime
 from domain.entities.student import Student
 from domain.repositories.student_repository import IStudentRepository
+from infrastructure.cache.identity_cache import IdentityCache
 from infrastructure.database.connection import DatabaseConnection
 
 
 class StudentRepository(IStudentRepository):
     
-    def __init__(self, db_connection: DatabaseConnection):
+    def __init__(self, db_connection: DatabaseConnection, identity_cache: IdentityCache | None = None):
         self.db = db_connection
+        self.identity_cache = identity_cache
     
     def create(self, student: Student) -> Student:
         query = """
@@ -21,6 +23,18 @@ class StudentRepository(IStudentRepository):
         student.id = student_id
         return student
     
+    def create_many(self, students: list[Student]) -> list[Student]:
+        query = """
+        INSERT INTO students (name, class_name, user_id, created_at)
+        VALUES (?, ?, ?, ?)
+        """
+        now = datetime.utcnow()
+        with self.db.write_transaction() as conn:
+            for student in students:
+                cursor = conn.execute(query, (student.name, student.class_name, student.user_id, now))
+                student.id = cursor.lastrowid
+        return students
+    
     def get_by_id(self, student_id: int) -> Student | None:
         query = "SELECT * FROM students WHERE id = ?"
         rows = self.db.execute_query(query, (student_id,))
@@ -45,28 +59,95 @@ class StudentRepository(IStudentRepository):
             return self._row_to_student(rows[0])
         return None
     
+    def get_by_parent(self, parent_id: int) -> list[Student]:
+        # Дети родителя одним JOIN по индексу idx_parent_child_parent
+        query = """
+        SELECT s.* FROM parent_child pc
+        JOIN students s ON s.id = pc.child_id
+        WHERE pc.parent_id = ?
+        ORDER BY s.name
+        """
+        rows = self.db.execute_query(query, (parent_id,))
+        return [self._row_to_student(row) for row in rows]
+    
+    def get_by_teacher(self, teacher_id: int) -> list[Student]:
+        # Ученики назначенных учителю классов (teacher_class) по индексу idx_students_class_name
+        query = """
+        SELECT s.* FROM teacher_class tc
+        JOIN students s ON s.class_name = tc.class_name
+        WHERE tc.teacher_id = ?
+        ORDER BY s.name
+        """
+        rows = self.db.execute_query(query, (teacher_id,))
+        return [self._row_to_student(row) for row in rows]
+    
+    def get_teacher_class_names(self, teacher_id: int) -> list[str]:
+        query = "SELECT class_name FROM teacher_class WHERE teacher_id = ? ORDER BY class_name"
+        rows = self.db.execute_query(query, (teacher_id,))
+        return [row['class_name'] for row in rows]
+    
+    def is_owned_by_user(self, student_id: int, user_id: int) -> bool:
+        query = "SELECT 1 FROM students WHERE id = ? AND user_id = ?"
+        return bool(self.db.execute_query(query, (student_id, user_id)))
+    
+    def has_parent(self, student_id: int, parent_id: int) -> bool:
+        query = "SELECT 1 FROM parent_child WHERE child_id = ? AND parent_id = ? LIMIT 1"
+        return bool(self.db.execute_query(query, (student_id, parent_id)))
+    
+    def is_in_teacher_classes(self, student_id: int, teacher_id: int) -> bool:
+        # Ученик по первичному ключу, назначение — по уникальному индексу (teacher_id, class_name)
+        query = """
+        SELECT 1 FROM students s
+        JOIN teacher_class tc ON tc.teacher_id = ? AND tc.class_name = s.class_name
+        WHERE s.id = ?
+        """
+        return bool(self.db.execute_query(query, (teacher_id, student_id)))
+    
+    def get_class_names(self) -> list[str]:
+        query = "SELECT DISTINCT class_name FROM students ORDER BY class_name"
+        rows = self.db.execute_query(query)
+        return [row['class_name'] for row in rows]
+    
     def update(self, student: Student) -> Student:
         query = """
         UPDATE students 
         SET name = ?, class_name = ?, user_id = ?
         WHERE id = ?
         """
+        # Профиль ученика кэшируется вместе с пользователем: сбрасываем и прежнего владельца, и нового
+        self._invalidate(student.id)
         self.db.execute_update(
             query,
             (student.name, student.class_name, student.user_id, student.id)
         )
+        self._invalidate_user(student.user_id)
         return student
     
     def delete(self, student_id: int) -> bool:
+        self._invalidate(student_id)
         query = "DELETE FROM students WHERE id = ?"
         self.db.execute_update(query, (student_id,))
         return True
     
+    def _invalidate(self, student_id: int):
+        if not self.identity_cache:
+            return
+        rows = self.db.execute_query("SELECT user_id FROM students WHERE id = ?", (student_id,))
+        if rows:
+            self._invalidate_user(rows[0]['user_id'])
+    
+    def _invalidate_user(self, user_id: int | None):
+        # Сразу и после фиксации: до неё параллельный load_user может закэшировать прежний профиль
+        if not self.identity_cache:
+            return
+        self.identity_cache.invalidate(user_id)
+        self.db.after_commit(lambda: self.identity_cache.invalidate(user_id))
+    
     def _row_to_student(self, row) -> Student:
         return Student(
             id=row['id'],
             name=row['name'],
             class_name=row['class_name'],
             user_id=row['user_id'],
-            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None
+            created_at=row['created_at']
         )
@@ -26,6 +26,9 @@ class SubjectRepository(ISubjectRepository):
         rows = self.db.execute_query(query)
         return [self._row_to_subject(row) for row in rows]
     
+    def get_all_by_id(self) -> dict[int, Subject]:
+        return {subject.id: subject for subject in self.get_all()}
+    
     def get_by_name(self, name: str) -> Subject | None:
         query = "SELECT * FROM subjects WHERE name = ?"
         rows = self.db.execute_query(query, (name,))
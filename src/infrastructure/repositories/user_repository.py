@@ -1,13 +1,15 @@
 from datetime import datetime
 from domain.entities.user import User, UserRole
 from domain.repositories.user_repository import IUserRepository
+from infrastructure.cache.identity_cache import IdentityCache
 from infrastructure.database.connection import DatabaseConnection
 
 
 class UserRepository(IUserRepository):
     
-    def __init__(self, db_connection: DatabaseConnection):
+    def __init__(self, db_connection: DatabaseConnection, identity_cache: IdentityCache | None = None):
         self.db = db_connection
+        self.identity_cache = identity_cache
     
     def create(self, user: User) -> User:
         query = """
@@ -22,6 +24,23 @@ class UserRepository(IUserRepository):
         user.id = user_id
         return user
     
+    def create_many(self, users: list[User]) -> list[User]:
+        query = """
+        INSERT INTO users (username, email, password_hash, role, first_name, last_name, is_active, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        now = datetime.utcnow()
+        # Одна транзакция на пачку; построчный execute нужен, чтобы получить id каждого пользователя
+        with self.db.write_transaction() as conn:
+            for user in users:
+                cursor = conn.execute(
+                    query,
+                    (user.username, user.email, user.password_hash, user.role.value,
+                     user.first_name, user.last_name, user.is_active, now)
+                )
+                user.id = cursor.lastrowid
+        return users
+    
     def get_by_id(self, user_id: int) -> User | None:
         query = "SELECT * FROM users WHERE id = ?"
         rows = self.db.execute_query(query, (user_id,))
@@ -65,13 +84,23 @@ class UserRepository(IUserRepository):
             (user.username, user.email, user.password_hash, user.role.value,
              user.first_name, user.last_name, user.is_active, user.id)
         )
+        # Смена пароля, роли или деактивация должны сразу отразиться на уже вошедшем пользователе
+        self._invalidate(user.id)
         return user
     
     def delete(self, user_id: int) -> bool:
         query = "DELETE FROM users WHERE id = ?"
         self.db.execute_update(query, (user_id,))
+        self._invalidate(user_id)
         return True
     
+    def _invalidate(self, user_id: int | None):
+        # Сразу — чтобы текущий запрос увидел свои изменения, и после фиксации —
+        # чтобы параллельный load_user не успел закэшировать прежнюю строку до неё
+        if self.identity_cache:
+            self.identity_cache.invalidate(user_id)
+            self.db.after_commit(lambda: self.identity_cache.invalidate(user_id))
+    
     def _row_to_user(self, row) -> User:
         return User(
             id=row['id'],
@@ -82,5 +111,5 @@ class UserRepository(IUserRepository):
             first_name=row['first_name'],
             last_name=row['last_name'],
             is_active=bool(row['is_active']),
-            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None
+            created_at=row['created_at']
         )
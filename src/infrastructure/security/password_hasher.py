@@ -0,0 +1,71 @@
+import os
+
+from functools import partial
+
+# werkzeug.security и пул процессов импортируются при первом хешировании:
+# пакет werkzeug тянет за собой сервер и тестовый клиент, а CLI-задачам они не нужны
+
+
+def _full_method(method: str) -> str:
+    # Полная запись метода так, как werkzeug сохраняет её в начале хеша: «pbkdf2:sha256:600000»
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if name == 'scrypt':
+        n, r, p = (args + ['32768', '8', '1'][len(args):])[:3]
+        return f'scrypt:{n}:{r}:{p}'
+    return method
+
+
+class PasswordHasher:
+    # pbkdf2 упирается в одно ядро, поэтому массовое хеширование раскладывается по процессам
+
+    def __init__(self, workers: int | None = None, chunk_size: int = 8, method: str = 'pbkdf2'):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._method_spec = method
+        self._method: str | None = None
+        self._pool = None
+
+    @property
+    def method(self) -> str:
+        if self._method is None:
+            self._method = _full_method(self._method_spec)
+        return self._method
+
+    def hash(self, password: str) -> str:
+        from werkzeug.security import generate_password_hash
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        from werkzeug.security import check_password_hash
+        return check_password_hash(password_hash, password)
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        if self.workers <= 1 or len(passwords) < 2:
+            return [self.hash(password) for password in passwords]
+        from concurrent.futures import ProcessPoolExecutor
+        from werkzeug.security import generate_password_hash
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        hash_password = partial(generate_password_hash, method=self.method)
+        return list(self._pool.map(hash_password, passwords, chunksize=self.chunk_size))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # Хеш создан с другими параметрами — пересчитываем при следующем успешном входе
+        return password_hash.split('$', 1)[0] != self.method
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
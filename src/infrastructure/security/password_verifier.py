@@ -0,0 +1,71 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from infrastructure.security.password_hasher import PasswordHasher
+
+
+class VerifierOverloaded(Exception):
+    pass
+
+
+class PasswordVerifier:
+    # Проверка паролей вынесена в отдельный ограниченный пул: hashlib отпускает GIL,
+    # а всплеск входов не занимает потоки, обслуживающие страницы дневника.
+    # Если очередь заполнена, новая работа сразу отклоняется.
+
+    def __init__(self, hasher: PasswordHasher, workers: int = 4, max_pending: int = 32,
+                 timeout: float = 10.0):
+        self.hasher = hasher
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-verify')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'verified': 0,
+            'hashed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+        }
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        result = self._run(self.hasher.verify, password_hash, password)
+        self._count('verified')
+        return result
+
+    def hash(self, password: str) -> str:
+        result = self._run(self.hasher.hash, password)
+        self._count('hashed')
+        return result
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self.hasher.needs_rehash(password_hash)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise VerifierOverloaded("Очередь проверки паролей переполнена")
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count('timeouts')
+            raise VerifierOverloaded("Проверка пароля не уложилась в отведённое время")
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {'workers': self.workers, 'max_pending': self.max_pending, **self._stats}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    # Корзина токенов на ключ (логин или IP); число ключей ограничено, старые вытесняются (LRU)
+
+    def __init__(self, capacity: int, refill_per_second: float, max_keys: int = 10000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.capacity), now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
@@ -0,0 +1,36 @@
+import argparse
+
+from infrastructure.database.connection import DatabaseConnection
+from infrastructure.database.migrations import (
+    LATEST_VERSION, MIGRATION_BATCH_SIZE, MIGRATIONS, get_schema_version, has_bulk_load_restore, migrate
+)
+
+
+def run_migrations(db_path: str, batch_size: int, status_only: bool):
+    # Применение миграций отдельно от запуска приложения — например, перед выкладкой
+    db = DatabaseConnection(db_path, pool_size=1)
+    try:
+        version = get_schema_version(db)
+        print(f"Версия схемы: {version} из {LATEST_VERSION}")
+        pending = [migration for migration in MIGRATIONS if migration.version > version]
+        if status_only:
+            if has_bulk_load_restore(db):
+                print("  ожидает: возврат индексов и триггеров прерванной массовой загрузки")
+            for migration in pending:
+                print(f"  ожидает: {migration.version} — {migration.description}")
+            return
+        applied = migrate(db, batch_size=batch_size, report=print)
+    finally:
+        db.close_all()
+    
+    print(f"✅ Применено миграций: {len(applied)}" if applied else "✅ Схема актуальна")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Миграции схемы базы данных дневника')
+    parser.add_argument('--db', default='instance/diary.db', help='Путь к файлу базы данных')
+    parser.add_argument('--batch-size', type=int, default=MIGRATION_BATCH_SIZE,
+                        help='Учеников на транзакцию при заполнении данных')
+    parser.add_argument('--status', action='store_true', help='Только показать версию и ожидающие миграции')
+    args = parser.parse_args()
+    run_migrations(args.db, args.batch_size, args.status)
@@ -0,0 +1,40 @@
+import hashlib
+
+from flask import Response, make_response, request, session
+
+
+# Условные запросы (ETag / 304) для страниц, которые часто обновляют без изменений данных.
+# Страница зависит от зрителя (меню и приветствие по роли), адреса с параметрами и версии данных,
+# поэтому всё это входит в ETag: разные пользователи никогда не получат чужую страницу
+
+
+def page_etag(current_user, version: tuple | None) -> str | None:
+    # Ожидающие flash-сообщения выводятся в страницу один раз — такую страницу не кэшируем
+    if version is None or session.get('_flashes'):
+        return None
+    parts = (
+        current_user.id, current_user.role.value, current_user.get_full_name(),
+        request.full_path, version
+    )
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def not_modified(etag: str | None) -> Response | None:
+    if etag is None or not request.if_none_match.contains(etag):
+        return None
+    return _with_validators(Response(status=304), etag)
+
+
+def cached_page(body: str, etag: str | None) -> Response:
+    response = make_response(body)
+    if etag is not None:
+        _with_validators(response, etag)
+    return response
+
+
+def _with_validators(response: Response, etag: str) -> Response:
+    # private: страница персональная; no-cache: браузер хранит её, но каждый раз сверяет ETag
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
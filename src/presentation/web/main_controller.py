@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, redirect, url_for
 from application.services.student_service import StudentService
+from presentation.web.http_cache import page_etag, not_modified, cached_page
 
 
 class MainController:
@@ -17,8 +18,14 @@ class MainController:
             if not current_user.is_authenticated:
                 return redirect(url_for('auth.login'))
             
+            etag = page_etag(current_user, self.student_service.get_students_version(current_user))
+            response = not_modified(etag)
+            if response:
+                return response
+            
             students = self.student_service.get_all_students(current_user)
-            return render_template('index.html', students=students)
+            stats = self.student_service.get_students_stats(students)
+            return cached_page(render_template('index.html', students=students, stats=stats), etag)
     
     def get_blueprint(self):
         return self.bp
@@ -1,12 +1,18 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, stream_with_context
 from flask_login import login_required
 from application.services.student_service import StudentService
+from application.services.report_service import ReportService
+from application.services.risk_service import RiskService
+from presentation.web.http_cache import page_etag, not_modified, cached_page
 
 
 class ReportsController:
     
-    def __init__(self, student_service: StudentService):
+    def __init__(self, student_service: StudentService, report_service: ReportService,
+                 risk_service: RiskService):
         self.student_service = student_service
+        self.report_service = report_service
+        self.risk_service = risk_service
         self.bp = Blueprint('reports', __name__)
         self._register_routes()
     
@@ -17,10 +23,68 @@ class ReportsController:
         def reports():
             from flask_login import current_user
             
+            # Отчёты строятся только по видимым ученикам, поэтому их версий достаточно для ETag
+            etag = page_etag(current_user, self.student_service.get_students_version(current_user))
+            response = not_modified(etag)
+            if response:
+                return response
+            
             # Получаем всех студентов для отчетов
             students = self.student_service.get_all_students(current_user)
+            stats = self.student_service.get_students_stats(students)
+            
+            subjects = self.report_service.get_subjects()
+            subject_id = request.args.get('subject_id', type=int)
+            selected_subject = next((s for s in subjects if s.id == subject_id), None)
+            report_data = None
+            if selected_subject:
+                report_data = self.report_service.get_subject_report(selected_subject.id, current_user)
+                if report_data and not report_data['students_data']:
+                    report_data = None
+            
+            # Статистика считается только по запросу: это проход по всем оценкам
+            statistics_by = request.args.get('statistics_by')
+            statistics = None
+            if statistics_by:
+                statistics = self.student_service.get_grade_statistics(
+                    current_user, statistics_by, selected_subject.id if selected_subject else None
+                )
+            
+            return cached_page(render_template('reports.html', students=students, stats=stats, subjects=subjects,
+                                               selected_subject=selected_subject, report_data=report_data,
+                                               statistics_by=statistics_by, statistics=statistics), etag)
+        
+        @self.bp.route('/at_risk')
+        @login_required
+        def at_risk():
+            from flask_login import current_user
+            
+            # Таблица student_risk заполняется пакетно (score_risk.py), страница только читает её
+            risks = self.risk_service.get_at_risk_students(current_user)
+            if risks is None:
+                flash('У вас нет прав для просмотра этой страницы', 'error')
+                return redirect(url_for('main.index'))
+            
+            return render_template('at_risk.html', risks=risks)
+        
+        @self.bp.route('/export_csv')
+        @login_required
+        def export_csv():
+            from flask_login import current_user
+            
+            # Без subject_id выгружается журнал по всем предметам
+            subject_id = request.args.get('subject_id', type=int)
+            rows = self.report_service.iter_csv(subject_id, current_user)
+            if rows is None:
+                flash('У вас нет прав для просмотра отчетов', 'error')
+                return redirect(url_for('main.index'))
             
-            return render_template('reports.html', students=students)
+            filename = f'report_subject_{subject_id}.csv' if subject_id else 'report_all.csv'
+            return Response(
+                stream_with_context(rows),
+                mimetype='text/csv',
+                headers={'Content-Disposition': f'attachment; filename={filename}'}
+            )
     
     def get_blueprint(self):
         return self.bp
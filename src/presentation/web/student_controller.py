@@ -1,12 +1,24 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from datetime import date
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
 from flask_login import login_required
-from application.services.student_service import StudentService
+from markupsafe import Markup
+from application.services.student_service import StudentService, DIARY_TABS, decode_cursor
+from infrastructure.cache.ttl_cache import TTLCache
+from presentation.web.http_cache import page_etag, not_modified, cached_page
+
+
+def _parse_date(value: str | None) -> date | None:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
 
 
 class StudentController:
     
-    def __init__(self, student_service: StudentService):
+    def __init__(self, student_service: StudentService, view_cache: TTLCache | None = None):
         self.student_service = student_service
+        self.view_cache = view_cache or TTLCache()
         self.bp = Blueprint('students', __name__)
         self._register_routes()
     
@@ -17,11 +29,35 @@ class StudentController:
         def student_diary(student_id):
             from flask_login import current_user
             
-            data = self.student_service.get_student_diary_data(student_id, current_user)
+            # Неизменившийся дневник отдаётся ответом 304 без чтения оценок и без шаблона
+            etag = page_etag(current_user, self.student_service.get_diary_version(student_id, current_user))
+            response = not_modified(etag)
+            if response:
+                return response
+            
+            data = self._get_diary_tab(student_id, current_user, request.args.get('tab', 'grades'))
             if data is None:
                 flash('У вас нет прав для просмотра данных этого студента', 'error')
                 return redirect(url_for('main.index'))
-            return render_template('student_diary.html', **data)
+            return cached_page(render_template('student_diary.html', **data), etag)
+
+        @self.bp.route('/<int:student_id>/tab/<tab>')
+        @login_required
+        def student_diary_tab(student_id, tab):
+            from flask_login import current_user
+            
+            # Фрагмент одной вкладки для подгрузки без перезагрузки страницы
+            if tab not in DIARY_TABS:
+                abort(404)
+            etag = page_etag(current_user, self.student_service.get_diary_version(student_id, current_user))
+            response = not_modified(etag)
+            if response:
+                return response
+            
+            data = self._get_diary_tab(student_id, current_user, tab)
+            if data is None:
+                abort(403)
+            return cached_page(render_template(f'diary/_{tab}.html', **data), etag)
 
         @self.bp.route('/<int:student_id>/add_grade', methods=['POST'])
         @login_required
@@ -53,8 +89,125 @@ class StudentController:
                 flash('Посещаемость отмечена!', 'success')
             else:
                 flash('У вас нет прав для отметки посещаемости', 'error')
-            return redirect(url_for('students.student_diary', student_id=student_id))
+            return redirect(url_for('students.student_diary', student_id=student_id, tab='attendance'))
+
+        @self.bp.route('/gradebook', methods=['GET', 'POST'])
+        @login_required
+        def gradebook():
+            from flask_login import current_user
+            
+            class_name = request.values.get('class_name', '')
+            subject_id = request.values.get('subject_id', type=int)
+            grade_date = request.values.get('date', '')
+            submitted = {}
+            errors = {}
+            
+            if request.method == 'POST':
+                # Поля формы: grade_<student_id> и comment_<student_id>
+                for key, value in request.form.items():
+                    if key.startswith('grade_') and key[len('grade_'):].isdigit():
+                        student_id = int(key[len('grade_'):])
+                        submitted[student_id] = (value, request.form.get(f'comment_{student_id}', ''))
+                
+                try:
+                    lesson_date = date.fromisoformat(grade_date) if grade_date else date.today()
+                except ValueError:
+                    lesson_date = None
+                
+                if lesson_date is None:
+                    flash('Некорректная дата урока', 'error')
+                elif subject_id is None:
+                    flash('Выберите предмет', 'error')
+                else:
+                    result = self.student_service.add_grades_bulk(
+                        class_name, subject_id, lesson_date, submitted, current_user
+                    )
+                    if result is None:
+                        flash('У вас нет прав для добавления оценок', 'error')
+                        return redirect(url_for('main.index'))
+                    
+                    created, errors = result
+                    if not errors:
+                        flash(f'Сохранено оценок: {created}', 'success')
+                        return redirect(url_for('students.gradebook', class_name=class_name, subject_id=subject_id))
+                    flash('Оценки не сохранены: исправьте ошибки в отмеченных строках', 'error')
+            
+            data = self.student_service.get_gradebook_data(class_name, subject_id, current_user)
+            if data is None:
+                flash('У вас нет прав для работы с журналом', 'error')
+                return redirect(url_for('main.index'))
+            return render_template('gradebook.html', submitted=submitted, errors=errors,
+                                   grade_date=grade_date or date.today().isoformat(), **data)
+
+        @self.bp.route('/roll_call', methods=['GET', 'POST'])
+        @login_required
+        def roll_call():
+            from flask_login import current_user
+            
+            class_name = request.values.get('class_name', '')
+            subject_id = request.values.get('subject_id', type=int)
+            valid_date = True
+            try:
+                lesson_date = date.fromisoformat(request.values.get('date') or date.today().isoformat())
+            except ValueError:
+                flash('Некорректная дата урока', 'error')
+                lesson_date, valid_date = date.today(), False
+            
+            if request.method == 'POST' and valid_date and subject_id is not None:
+                # Отсутствующие чекбоксы не отправляются, поэтому список учеников передаётся отдельно
+                marks = {
+                    student_id: (f'present_{student_id}' in request.form,
+                                 request.form.get(f'reason_{student_id}', ''))
+                    for student_id in request.form.getlist('student_id', type=int)
+                }
+                result = self.student_service.record_roll_call(
+                    class_name, subject_id, lesson_date, marks, current_user
+                )
+                if result is None:
+                    flash('У вас нет прав для отметки посещаемости', 'error')
+                    return redirect(url_for('main.index'))
+                
+                flash(f'Посещаемость отмечена: {result} учеников', 'success')
+                return redirect(url_for('students.roll_call', class_name=class_name,
+                                        subject_id=subject_id, date=lesson_date.isoformat()))
+            
+            data = self.student_service.get_roll_call_data(class_name, subject_id, lesson_date, current_user)
+            if data is None:
+                flash('У вас нет прав для отметки посещаемости', 'error')
+                return redirect(url_for('main.index'))
+            return render_template('roll_call.html', **data)
+
+        @self.bp.route('/class_matrix')
+        @login_required
+        def class_matrix():
+            from flask_login import current_user
+            
+            class_name = request.args.get('class_name', '')
+            key = self.student_service.get_class_matrix_key(class_name, current_user)
+            if key is None:
+                flash('У вас нет прав для просмотра журнала', 'error')
+                return redirect(url_for('main.index'))
+            
+            matrix_html = None
+            if class_name:
+                # Таблица одинакова для всех учителей; ключ включает версию данных класса
+                matrix_html = self.view_cache.get(key)
+                if matrix_html is None:
+                    data = self.student_service.get_class_matrix_data(class_name, current_user)
+                    matrix_html = Markup(render_template('_class_matrix.html', **data))
+                    self.view_cache.set(key, matrix_html)
+            
+            return render_template('class_matrix.html', class_names=self.student_service.get_class_names(current_user),
+                                   class_name=class_name, matrix_html=matrix_html)
 
     
     def get_blueprint(self):
         return self.bp
+    
+    def _get_diary_tab(self, student_id: int, current_user, tab: str):
+        return self.student_service.get_student_diary_data(
+            student_id, current_user, tab,
+            before=decode_cursor(request.args.get(f'{tab}_before')),
+            date_from=_parse_date(request.args.get('date_from')),
+            date_to=_parse_date(request.args.get('date_to'))
+        )
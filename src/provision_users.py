@@ -0,0 +1,50 @@
+import argparse
+import csv
+import json
+
+from container import ApplicationContainer
+
+
+def read_users(path: str):
+    # CSV: username,email,password,role,first_name,last_name,class_name,children (логины через «;»)
+    # JSONL: те же поля, children — список
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(f):
+                row['children'] = [child for child in (row.get('children') or '').split(';') if child]
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def provision(path: str, batch_size: int, workers: int | None):
+    container = ApplicationContainer()
+    container._init_database()
+    container._init_repositories()
+    container._init_services()
+    
+    service = container.services['provisioning']
+    if workers:
+        service.password_hasher.workers = workers
+    try:
+        counts = service.provision_users(read_users(path), batch_size=batch_size, report=print)
+    finally:
+        service.password_hasher.close()
+        container.db_connection.close_all()
+    
+    print(f"✅ Пользователей: {counts['users']}, профилей учеников: {counts['students']}, "
+          f"связей родитель-ребенок: {counts['parent_child']}, "
+          f"не найдено детей: {counts['unresolved_children']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Массовое создание пользователей')
+    parser.add_argument('source', help='CSV или JSONL со списком пользователей')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Количество пользователей в одной пачке')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Число процессов для хеширования паролей (по умолчанию — число ядер)')
+    args = parser.parse_args()
+    provision(args.source, args.batch_size, args.workers)
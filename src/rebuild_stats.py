@@ -0,0 +1,22 @@
+import time
+
+from container import ApplicationContainer
+
+
+def rebuild_stats():
+    # Полный пересчёт таблицы student_subject_stats по grades и attendance
+    container = ApplicationContainer()
+    container._init_database()
+    container._init_repositories()
+    
+    started = time.perf_counter()
+    try:
+        rows = container.repositories['stats'].rebuild()
+    finally:
+        container.db_connection.close_all()
+    
+    print(f"✅ Агрегаты пересчитаны: {rows} строк за {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == '__main__':
+    rebuild_stats()
@@ -1,22 +1,10 @@
 import os
-from flask import Flask
-from flask_login import LoginManager
+from flask import Flask, jsonify, abort, g, request
+from flask_login import LoginManager, login_required, current_user
+from jinja2 import FileSystemBytecodeCache
 
-# Infrastructure
-from infrastructure.database.connection import DatabaseConnection
-from infrastructure.database.schema import CREATE_TABLES_SQL, INDEXES_SQL
-
-# Repositories
-from infrastructure.repositories.user_repository import UserRepository
-from infrastructure.repositories.student_repository import StudentRepository
-from infrastructure.repositories.subject_repository import SubjectRepository
-from infrastructure.repositories.grade_repository import GradeRepository
-from infrastructure.repositories.attendance_repository import AttendanceRepository
-from infrastructure.repositories.schedule_repository import ScheduleRepository
-
-# Application Services
-from application.services.auth_service import AuthService
-from application.services.student_service import StudentService
+from container import ApplicationContainer
+from infrastructure.cache.ttl_cache import TTLCache
 
 # Controllers
 from presentation.web.main_controller import MainController
@@ -28,13 +16,11 @@ from presentation.web.reports_controller import ReportsController
 from domain.entities.user import User
 
 
-class CleanArchitectureApp:
+class CleanArchitectureApp(ApplicationContainer):
     
     def __init__(self):
-        self.app = None
-        self.db_connection = None
-        self.repositories = {}
-        self.services = {}
+        super().__init__()
+        self.view_cache = None
         self.controllers = {}
         self.login_manager = LoginManager()
     
@@ -48,16 +34,43 @@ class CleanArchitectureApp:
         
         # Конфигурация
         self.app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
+        self.app.config['DATABASE_POOL_SIZE'] = int(os.environ.get('DATABASE_POOL_SIZE', 8))
+        self.app.config['DATABASE_CACHED_STATEMENTS'] = int(os.environ.get('DATABASE_CACHED_STATEMENTS', 256))
+        self.app.config['DATABASE_PROFILE'] = os.environ.get('DATABASE_PROFILE', 'performance')
+        self.app.config['DATABASE_MIGRATION_BATCH'] = int(os.environ.get('DATABASE_MIGRATION_BATCH', 500))
+        self.app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 0)) or None
+        self.app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2')
+        self.app.config['LOGIN_VERIFY_WORKERS'] = int(os.environ.get('LOGIN_VERIFY_WORKERS', 4))
+        self.app.config['LOGIN_VERIFY_QUEUE'] = int(os.environ.get('LOGIN_VERIFY_QUEUE', 32))
+        self.app.config['LOGIN_USER_BURST'] = int(os.environ.get('LOGIN_USER_BURST', 5))
+        self.app.config['LOGIN_IP_BURST'] = int(os.environ.get('LOGIN_IP_BURST', 30))
+        self.app.config['IDENTITY_CACHE_SIZE'] = int(os.environ.get('IDENTITY_CACHE_SIZE', 10000))
+        self.app.config['IDENTITY_CACHE_TTL'] = float(os.environ.get('IDENTITY_CACHE_TTL', 60))
+        self.app.config['REFERENCE_CACHE_TTL'] = float(os.environ.get('REFERENCE_CACHE_TTL', 300))
+        self.app.config['VIEW_CACHE_SIZE'] = int(os.environ.get('VIEW_CACHE_SIZE', 256))
+        self.app.config['VIEW_CACHE_TTL'] = float(os.environ.get('VIEW_CACHE_TTL', 600))
+        self.app.config['JINJA_CACHE_DIR'] = os.environ.get(
+            'JINJA_CACHE_DIR', os.path.join(basedir, 'instance', 'jinja_cache')
+        )
+        
+        # Скомпилированные шаблоны на диске
+        self._init_template_cache()
         
         # Инициализация базы данных
         self._init_database()
         
+        # Одна транзакция базы данных на запрос
+        self._init_unit_of_work()
+        
         # Инициализация репозиториев
         self._init_repositories()
         
         # Инициализация сервисов
         self._init_services()
         
+        # Кэш прав доступа на время запроса
+        self._init_request_cache()
+        
         # Инициализация контроллеров
         self._init_controllers()
         
@@ -67,50 +80,82 @@ class CleanArchitectureApp:
         # Регистрация маршрутов
         self._register_blueprints()
         
+        # Служебная статистика для администратора
+        self._register_diagnostics()
+        
         return self.app
     
-    def _init_database(self):
-        self.db_connection = DatabaseConnection()
-        
-        # Создание таблиц
-        with self.db_connection.get_connection() as conn:
-            conn.executescript(CREATE_TABLES_SQL)
-            conn.executescript(INDEXES_SQL)
+    def _init_template_cache(self):
+        # Перезапущенный воркер берёт байткод шаблонов из файлов, а не компилирует их заново;
+        # пустой JINJA_CACHE_DIR отключает кэш
+        cache_dir = self.app.config['JINJA_CACHE_DIR']
+        if not cache_dir:
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        self.app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
     
-    def _init_repositories(self):
-        self.repositories = {
-            'user': UserRepository(self.db_connection),
-            'student': StudentRepository(self.db_connection),
-            'subject': SubjectRepository(self.db_connection),
-            'grade': GradeRepository(self.db_connection),
-            'attendance': AttendanceRepository(self.db_connection),
-            'schedule': ScheduleRepository(self.db_connection),
-        }
+    def precompile_templates(self) -> int:
+        # Заполнение кэша байткода до старта воркеров, например при выкладке
+        env = self.app.jinja_env
+        names = [name for name in env.list_templates() if name.endswith('.html')]
+        for name in names:
+            env.get_template(name)
+        return len(names)
     
-    def _init_services(self):
-        self.services = {
-            'auth': AuthService(
-                self.repositories['user'],
-                self.repositories['student']
-            ),
-        }
+    def _init_unit_of_work(self):
         
-        # Student service зависит от auth service
-        self.services['student'] = StudentService(
-            self.repositories['student'],
-            self.repositories['grade'],
-            self.repositories['attendance'],
-            self.repositories['schedule'],
-            self.repositories['subject'],
-            self.services['auth']
-        )
+        @self.app.before_request
+        def begin_unit_of_work():
+            if request.endpoint == 'static':
+                return
+            read_only = request.method in ('GET', 'HEAD', 'OPTIONS')
+            g.unit_of_work = self.db_connection.begin_unit_of_work(read_only=read_only)
+        
+        @self.app.after_request
+        def commit_unit_of_work(response):
+            # Фиксируем до отправки ответа, чтобы ошибка записи превратилась в 500, а не потерялась.
+            # Flask вызывает after_request и для ответа об ошибке — частичные записи такого запроса откатываем
+            unit_of_work = g.get('unit_of_work')
+            if unit_of_work:
+                if response.status_code >= 500:
+                    unit_of_work.rollback()
+                else:
+                    unit_of_work.commit()
+            return response
+        
+        @self.app.teardown_appcontext
+        def finish_unit_of_work(error):
+            unit_of_work = g.pop('unit_of_work', None)
+            if unit_of_work:
+                unit_of_work.finish(error)
+    
+    def _init_request_cache(self):
+        auth_service = self.services['auth']
+        
+        @self.app.before_request
+        def begin_request_cache():
+            g.auth_request = auth_service.begin_request()
+        
+        @self.app.teardown_request
+        def end_request_cache(error):
+            token = g.pop('auth_request', None)
+            if token is not None:
+                auth_service.end_request(token)
     
     def _init_controllers(self):
+        config = self.app.config if self.app else {}
+        # Готовые фрагменты страниц; ключи содержат версию данных, поэтому устаревшие записи просто вытесняются
+        self.view_cache = TTLCache(
+            max_size=config.get('VIEW_CACHE_SIZE', 256),
+            ttl=config.get('VIEW_CACHE_TTL', 600)
+        )
         self.controllers = {
             'main': MainController(self.services['student']),
-            'student': StudentController(self.services['student']),
+            'student': StudentController(self.services['student'], self.view_cache),
             'auth': AuthController(self.services['auth']),
-            'reports': ReportsController(self.services['student'])
+            'reports': ReportsController(
+                self.services['student'], self.services['report'], self.services['risk']
+            )
         }
     
     def _init_login_manager(self):
@@ -121,11 +166,18 @@ class CleanArchitectureApp:
         
         @self.login_manager.user_loader
         def load_user(user_id):
+            user = self.identity_cache.get(int(user_id))
+            if user:
+                return user
             user = self.repositories['user'].get_by_id(int(user_id))
             if user and user.is_student():
                 # Загружаем профиль студента для пользователей с ролью student
                 student_profile = self.repositories['student'].get_by_user_id(user.id)
                 user.student_profile = student_profile
+            if not user or not user.is_active:
+                # Деактивированный пользователь разлогинивается на следующем же запросе
+                return None
+            self.identity_cache.put(user)
             return user
     
     def _register_blueprints(self):
@@ -133,6 +185,22 @@ class CleanArchitectureApp:
         self.app.register_blueprint(self.controllers['student'].get_blueprint(), url_prefix='/student')
         self.app.register_blueprint(self.controllers['auth'].get_blueprint(), url_prefix='/auth')
         self.app.register_blueprint(self.controllers['reports'].get_blueprint(), url_prefix='/reports')
+    
+    def _register_diagnostics(self):
+        
+        @self.app.route('/admin/stats')
+        @login_required
+        def admin_stats():
+            if not current_user.is_admin():
+                abort(403)
+            return jsonify(
+                database=self.db_connection.get_pool_stats(),
+                writes=self.db_connection.get_write_stats(),
+                login=self.services['auth'].password_verifier.get_stats(),
+                identity_cache=self.identity_cache.get_stats(),
+                reference_cache=self.reference_cache.get_stats(),
+                view_cache=self.view_cache.get_stats()
+            )
 
 
 def create_app():
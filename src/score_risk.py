@@ -0,0 +1,29 @@
+import argparse
+
+from container import ApplicationContainer
+from application.services.risk_service import RISK_WINDOW_DAYS
+
+
+def score_risk(window_days: int, workers: int | None):
+    # Пересчёт таблицы student_risk; запускается по расписанию, например раз в ночь
+    container = ApplicationContainer()
+    container._init_database()
+    container._init_repositories()
+    container._init_services()
+    
+    try:
+        count = container.services['risk'].run_scoring(window_days=window_days, workers=workers, report=print)
+    finally:
+        container.db_connection.close_all()
+    
+    print(f"✅ Риск неуспеваемости пересчитан для {count} учеников")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Оценка риска неуспеваемости учеников')
+    parser.add_argument('--window-days', type=int, default=RISK_WINDOW_DAYS,
+                        help='Сколько последних дней учитывать')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Число процессов (по умолчанию — один проход в текущем процессе)')
+    args = parser.parse_args()
+    score_risk(args.window_days, args.workers)
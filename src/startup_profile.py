@@ -0,0 +1,92 @@
+import argparse
+import os
+import subprocess
+import sys
+
+
+BASEDIR = os.path.abspath(os.path.dirname(__file__))
+
+# Каждая фаза замеряется в отдельном свежем интерпретаторе — так же стартует воркер или CLI-задача
+STARTUP_PHASES = {
+    'cli': (
+        "from container import ApplicationContainer\n"
+        "container = ApplicationContainer()\n"
+        "container._init_database()\n"
+        "container._init_repositories()\n"
+        "container._init_services()\n"
+    ),
+    'web': (
+        "from run import create_app\n"
+        "app = create_app()\n"
+        "app.test_client().get('/auth/login')\n"
+    ),
+}
+
+TIMED_SNIPPET = (
+    "import time\n"
+    "started = time.perf_counter()\n"
+    "{code}"
+    "print(round((time.perf_counter() - started) * 1000, 1))\n"
+)
+
+
+def measure_phase(code: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', TIMED_SNIPPET.format(code=code)], cwd=BASEDIR,
+                                check=True, capture_output=True, text=True).stdout
+        timings.append(float(output.split()[-1]))
+    return sorted(timings)[len(timings) // 2]
+
+
+def import_profile(module: str) -> list[tuple[int, int, str]]:
+    # Разбор вывода -X importtime: «import time: собственное | накопленное | модуль», микросекунды
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=BASEDIR,
+                            check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def print_import_profile(module: str, top: int):
+    rows = import_profile(module)
+    total = max((cumulative for _, cumulative, name in rows if name.strip() == module), default=0)
+    print(f"Импорт {module}: {total / 1000:.0f} мс, модулей: {len(rows)}")
+    print(f"{'накоп., мс':>11} {'собств., мс':>12}  модуль")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[1], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>11.1f} {self_us / 1000:>12.1f}  {name}")
+
+
+def precompile_templates():
+    from run import CleanArchitectureApp
+
+    app_factory = CleanArchitectureApp()
+    app_factory.create_app()
+    try:
+        count = app_factory.precompile_templates()
+    finally:
+        app_factory.db_connection.close_all()
+    print(f"✅ Шаблонов скомпилировано: {count} → {app_factory.app.config['JINJA_CACHE_DIR']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Время запуска приложения и CLI-задач по фазам и импортам')
+    parser.add_argument('--module', default='run', help='Модуль для профиля импорта (по умолчанию run)')
+    parser.add_argument('--top', type=int, default=25, help='Сколько самых дорогих импортов показать')
+    parser.add_argument('--runs', type=int, default=5, help='Запусков на фазу; выводится медиана')
+    parser.add_argument('--precompile-templates', action='store_true',
+                        help='Только заполнить кэш байткода шаблонов и выйти')
+    args = parser.parse_args()
+
+    if args.precompile_templates:
+        precompile_templates()
+        sys.exit(0)
+
+    for phase, code in STARTUP_PHASES.items():
+        print(f"Запуск {phase}: {measure_phase(code, args.runs):.0f} мс (медиана из {args.runs})")
+    print()
+    print_import_profile(args.module, args.top)
@@ -0,0 +1,39 @@
+// Переключение вкладок дневника без перезагрузки страницы: подгружаем только фрагмент вкладки.
+// Без JavaScript ссылки вкладок работают как обычные переходы.
+document.addEventListener('DOMContentLoaded', function () {
+    var container = document.getElementById('diary-tab');
+    var tabName = document.getElementById('diary-tab-name');
+    if (!container) {
+        return;
+    }
+
+    document.querySelectorAll('.diary-tabs [data-fragment-url]').forEach(function (link) {
+        link.addEventListener('click', function (event) {
+            event.preventDefault();
+            fetch(link.dataset.fragmentUrl, { credentials: 'same-origin' })
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error(response.status);
+                    }
+                    return response.text();
+                })
+                .then(function (html) {
+                    container.innerHTML = html;
+                    document.querySelectorAll('.diary-tabs .tab-btn').forEach(function (tab) {
+                        tab.classList.toggle('active', tab === link);
+                    });
+                    if (tabName) {
+                        tabName.value = link.dataset.tab;
+                    }
+                    history.pushState(null, '', link.href);
+                })
+                .catch(function () {
+                    window.location = link.href;
+                });
+        });
+    });
+
+    window.addEventListener('popstate', function () {
+        window.location.reload();
+    });
+});
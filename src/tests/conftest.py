@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture
+def app_factory(tmp_path, monkeypatch):
+    from run import CleanArchitectureApp
+
+    # База создаётся по относительному пути instance/diary.db — каждый тест получает свою
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('JINJA_CACHE_DIR', '')
+    factory = CleanArchitectureApp()
+    factory.create_app()
+    yield factory
+    factory.db_connection.close_all()
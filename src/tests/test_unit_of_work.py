@@ -0,0 +1,45 @@
+from flask import abort
+
+
+def _count_subjects(db, name):
+    return db.execute_query("SELECT COUNT(*) FROM subjects WHERE name = ?", (name,))[0][0]
+
+
+def _register_write_route(factory, rule, finish):
+    db = factory.db_connection
+
+    def view():
+        db.execute_write("INSERT INTO subjects (name, teacher) VALUES (?, ?)", (rule, 'Тест'))
+        return finish()
+
+    factory.app.add_url_rule(f'/{rule}', rule, view, methods=['POST'])
+
+
+def test_request_commits_writes(app_factory):
+    _register_write_route(app_factory, 'ok', lambda: 'ok')
+
+    response = app_factory.app.test_client().post('/ok')
+
+    assert response.status_code == 200
+    assert _count_subjects(app_factory.db_connection, 'ok') == 1
+
+
+def test_unhandled_error_rolls_back_writes(app_factory):
+    def fail():
+        raise RuntimeError('сбой после записи')
+
+    _register_write_route(app_factory, 'fails', fail)
+
+    response = app_factory.app.test_client().post('/fails')
+
+    assert response.status_code == 500
+    assert _count_subjects(app_factory.db_connection, 'fails') == 0
+
+
+def test_server_error_response_rolls_back_writes(app_factory):
+    _register_write_route(app_factory, 'aborts', lambda: abort(500))
+
+    response = app_factory.app.test_client().post('/aborts')
+
+    assert response.status_code == 500
+    assert _count_subjects(app_factory.db_connection, 'aborts') == 0